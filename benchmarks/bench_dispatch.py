@@ -0,0 +1,53 @@
+"""
+Conta quantas chamadas de tradutor a tabela compilada evitou (predicados applies).
+
+Uso: python -m benchmarks.bench_dispatch arquivo.xml [diretorio ...]
+Diretórios são percorridos atrás de *.xml. A contagem só existe com a
+instrumentação de profiling ligada, então o tempo impresso a inclui.
+"""
+import argparse
+import time
+from pathlib import Path
+
+from source.xml2clearly import profiling
+from source.xml2clearly.registry import AVOIDED_CALLS
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+
+def iter_xml_files(paths):
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(path.rglob("*.xml"))
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    files = nodes = 0
+    elapsed = 0.0
+    profiling.reset()
+    profiling.enable()
+    try:
+        for xml_file in iter_xml_files(args.paths):
+            root = generate_tag(str(xml_file))
+            nodes += sum(1 for _ in root.walk())
+            start = time.perf_counter()
+            translate(root)
+            elapsed += time.perf_counter() - start
+            files += 1
+    finally:
+        profiling.disable()
+
+    print(f"{files} arquivo(s), {nodes} nós, tradução instrumentada {elapsed * 1000:.1f} ms")
+    print(f"chamadas evitadas: {sum(AVOIDED_CALLS.values())}")
+    for tag_name, count in AVOIDED_CALLS.most_common():
+        print(f"  {tag_name:<12} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Mede o motor de tradução com pilha explícita em árvores profundas.
+
+Uso: python -m benchmarks.bench_engine [--depth 100] [--repeat 200] [--max-depth 100000]
+
+Compara translate() com um condutor recursivo dos mesmos tradutores (um frame
+Python por nó) numa profundidade que a recursão aguenta, e depois traduz cadeias
+com --max-depth níveis, que só a pilha explícita consegue. As árvores são
+montadas direto em Tag: XML do srcML passa por lxml, que não aceita mais de
+2048 níveis.
+"""
+import argparse
+import sys
+import time
+
+from source.xml2clearly.context import TranslationContext
+from source.xml2clearly.registry import DISPATCH
+from source.xml2clearly.translate import translate, translate_generic
+from source.xml2clearly.xml_manager import EMPTY_ATTRIB, NO_END, NO_START, Tag
+
+def make_tag(name, parent=None, text=""):
+    """Cria um Tag direto, sem lxml: o lxml fica quadrático em árvores muito profundas."""
+    tag = Tag.__new__(Tag)
+    tag.name, tag.text, tag.parent, tag.attrib = name, text, parent, EMPTY_ATTRIB
+    tag._start, tag._end = NO_START, NO_END
+    tag.indent_level = 0
+    if parent is not None:
+        tag.indent_level = parent.indent_level + 1 if parent.name == "block" else parent.indent_level
+        parent.children.append(tag)
+    tag.children = []
+    return tag
+
+
+def nested_calls(depth):
+    """f(f(f(...(1)...)))"""
+    root = expr = make_tag("expr")
+    for _ in range(depth):
+        call = make_tag("call", expr)
+        make_tag("name", call, "f")
+        argument = make_tag("argument", make_tag("argument_list", call))
+        expr = make_tag("expr", argument)
+    make_tag("literal", expr, "1")
+    return root
+
+
+def nested_exprs(depth):
+    """Cadeia de <expr> aninhados terminando num literal."""
+    root = expr = make_tag("expr")
+    for _ in range(depth):
+        expr = make_tag("expr", expr)
+    make_tag("literal", expr, "1")
+    return root
+
+
+def nested_initializer(depth):
+    """int v = {{{...{1}...}}};"""
+    decl = make_tag("decl")
+    make_tag("name", make_tag("type", decl), "int")
+    make_tag("name", decl, "v")
+    expr = make_tag("expr", make_tag("init", decl))
+    for _ in range(depth):
+        expr = make_tag("expr", make_tag("block", expr))
+    make_tag("literal", expr, "1")
+    return decl
+
+
+SHAPES = {"calls": nested_calls, "exprs": nested_exprs, "initializer": nested_initializer}
+
+
+def recursive_translate(tag, ctx=None):
+    """Condutor de referência: recursivo, um frame por nó."""
+    if ctx is None:
+        ctx = TranslationContext(recursive_translate)
+
+    for func, applies, continuation in DISPATCH.get(tag.name, ()):
+        if applies is not None and not applies(tag):
+            continue
+        result = _drive(func(tag, ctx), ctx) if continuation else func(tag, ctx)
+        if result is not None:
+            return result
+    return _drive(translate_generic(tag), ctx)
+
+
+def _drive(gen, ctx):
+    try:
+        request = gen.send(None)
+        while True:
+            request = gen.send(recursive_translate(request, ctx))
+    except StopIteration as stop:
+        return stop.value
+
+
+def best_time(func, tag, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(tag)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--max-depth", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"profundidade {args.depth} (limite de recursão {sys.getrecursionlimit()})")
+    print(f"{'forma':<12} {'recursivo ms':>13} {'pilha ms':>10} {'ganho':>7}")
+    for name, build in SHAPES.items():
+        tag = build(args.depth)
+        assert recursive_translate(tag) == translate(tag)
+        rec = best_time(recursive_translate, tag, args.repeat)
+        stack = best_time(translate, tag, args.repeat)
+        print(f"{name:<12} {rec * 1000:>13.3f} {stack * 1000:>10.3f} {rec / stack:>6.2f}x")
+
+    print(f"\nprofundidade {args.max_depth}, só pilha explícita")
+    for name in ("exprs", "initializer"):
+        tag = SHAPES[name](args.max_depth)
+        print(f"{name:<12} {best_time(translate, tag, 1) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
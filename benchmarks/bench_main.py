@@ -0,0 +1,43 @@
+"""
+Vazão do tradutor paralelo (source.main) com 1, 2, 4... processos.
+
+Uso: python -m benchmarks.bench_main diretorio_c [--jobs 1 2 4 8] [--cache]
+Sem --cache, todo arquivo passa pelo srcML (o cenário de uma primeira execução).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from source.c2xml import collect_c_files
+from source.main import translate_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source")
+    parser.add_argument("--jobs", type=int, nargs="+")
+    parser.add_argument("--cache", action="store_true", help="usa o cache de XML do srcML")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    jobs_list = args.jobs or sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    files = len(collect_c_files([args.source]))
+    print(f"{files} arquivo(s), {cores} núcleo(s)")
+    print(f"{'jobs':>4} {'segundos':>9} {'arq/s':>8} {'ganho':>7} {'eficiência':>11}")
+
+    base = None
+    for jobs in jobs_list:
+        with tempfile.TemporaryDirectory() as output:
+            start = time.perf_counter()
+            results = translate_tree(args.source, output, jobs=jobs, use_cache=args.cache)
+            elapsed = time.perf_counter() - start
+        failed = sum(1 for status, _, _ in results.values() if status != "ok")
+        base = base or elapsed * jobs_list[0]
+        speedup = base / elapsed
+        print(f"{jobs:>4} {elapsed:>9.2f} {files / elapsed:>8.1f} {speedup:>6.2f}x {speedup / jobs:>10.0%}"
+              + (f"  ({failed} falha(s))" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
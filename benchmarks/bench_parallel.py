@@ -0,0 +1,39 @@
+"""
+Tradução de um único <unit> em paralelo (blocos de filhos de topo) contra a serial.
+
+Uso: python -m benchmarks.bench_parallel arquivo.xml [--workers 2 4 8]
+"""
+import argparse
+import os
+import time
+
+from source.xml2clearly.parallel import translate_parallel
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("xml")
+    parser.add_argument("--workers", type=int, nargs="+")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers_list = args.workers or sorted({2, 4, cores} - {1})
+
+    start = time.perf_counter()
+    expected = translate(generate_tag(args.xml))
+    serial = time.perf_counter() - start
+    print(f"{'workers':>7} {'segundos':>9} {'ganho':>7}")
+    print(f"{'serial':>7} {serial:>9.2f} {1:>6.2f}x")
+
+    for workers in workers_list:
+        start = time.perf_counter()
+        output = translate_parallel(args.xml, workers=workers, min_nodes=0)
+        elapsed = time.perf_counter() - start
+        assert output == expected
+        print(f"{workers:>7} {elapsed:>9.2f} {serial / elapsed:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
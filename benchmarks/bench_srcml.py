@@ -0,0 +1,49 @@
+"""
+Mede o custo de partida de uma execução do srcML: AppImage se extraindo a cada
+chamada (APPIMAGE_EXTRACT_AND_RUN=1) contra o AppRun extraído no cache.
+
+Uso: python -m benchmarks.bench_srcml [--repeat 20]
+Cada execução é `srcml --version`, então o tempo medido é quase só partida.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import time
+
+from source.srcml import APPIMAGE, extracted_srcml, srcml_env
+
+
+def time_runs(command, env, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    apprun = extracted_srcml()
+    print(f"cache: {apprun.parent} ({(time.perf_counter() - start) * 1000:.1f} ms para resolver)")
+
+    runs = {
+        "appimage": time_runs([str(APPIMAGE), "--version"], srcml_env(), args.repeat),
+        "cache": time_runs([str(apprun), "--version"], os.environ.copy(), args.repeat),
+    }
+
+    print(f"{'modo':<10} {'mediana ms':>11} {'mín ms':>8}")
+    for name, times in runs.items():
+        print(f"{name:<10} {statistics.median(times) * 1000:>11.1f} {min(times) * 1000:>8.1f}")
+
+    saving = statistics.median(runs["appimage"]) - statistics.median(runs["cache"])
+    print(f"economia por execução: {saving * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compara o Tag compacto (__slots__, construção iterativa) e o LazyTag com o Tag original.
+
+Uso: python -m benchmarks.bench_tag [--nodes 100000] [--repeat 3] [--xml arquivo.xml]
+Mostra bytes por nó (tracemalloc, depois de traduzir a árvore inteira), tempo de
+construção e tempo de construção + tradução por 100k nós.
+"""
+import argparse
+import time
+import tracemalloc
+
+from lxml import etree
+
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import LazyTag, Tag, TagBase
+
+SRC_NS = "http://www.srcML.org/srcML/src"
+POS_NS = "http://www.srcML.org/srcML/position"
+
+
+class LegacyTag(TagBase):
+    """Cópia do Tag anterior (__dict__, cópia dos atributos, tuplas de posição, recursivo)."""
+
+    def __init__(self, elem, parent=None):
+        self.name = etree.QName(elem).localname
+        self.attrib = dict(elem.attrib)
+
+        start_str = self.attrib.get("{http://www.srcML.org/srcML/position}start")
+        end_str = self.attrib.get("{http://www.srcML.org/srcML/position}end")
+
+        self.start = tuple(map(int, start_str.split(":"))) if start_str else (float("inf"), float("inf"))
+        self.end = tuple(map(int, end_str.split(":"))) if end_str else (float("-inf"), float("-inf"))
+
+        self.text = (elem.text or "").strip()
+        self.parent = parent
+
+        if parent:
+            self.indent_level = parent.indent_level + 1 if parent.name == "block" else parent.indent_level
+        else:
+            self.indent_level = 0
+
+        self.children = [LegacyTag(child, self) for child in elem]
+        self.children.sort(key=lambda c: c.start)
+
+
+def build_sample(nodes):
+    """Gera um <unit> com decl_stmts no formato do srcML até ter ~nodes elementos."""
+    unit = etree.Element(f"{{{SRC_NS}}}unit", nsmap={None: SRC_NS, "pos": POS_NS})
+    count, line = 1, 1
+    while count < nodes:
+        pos = {f"{{{POS_NS}}}start": f"{line}:1", f"{{{POS_NS}}}end": f"{line}:20"}
+        stmt = etree.SubElement(unit, f"{{{SRC_NS}}}decl_stmt", pos)
+        decl = etree.SubElement(stmt, f"{{{SRC_NS}}}decl", pos)
+        type_ = etree.SubElement(decl, f"{{{SRC_NS}}}type", pos)
+        etree.SubElement(type_, f"{{{SRC_NS}}}name", pos).text = "int"
+        etree.SubElement(decl, f"{{{SRC_NS}}}name", pos).text = f"v{line}"
+        init = etree.SubElement(decl, f"{{{SRC_NS}}}init", pos)
+        expr = etree.SubElement(init, f"{{{SRC_NS}}}expr", pos)
+        literal = etree.SubElement(expr, f"{{{SRC_NS}}}literal", pos, type="number")
+        literal.text = str(line)
+        count += 8
+        line += 1
+    return unit, count
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(cls, root, nodes, repeat):
+    build = best_time(lambda: cls(root), repeat)
+    build_translate = best_time(lambda: translate(cls(root)), repeat)
+
+    # Memória dos objetos Python que sobrevivem a uma tradução completa
+    tracemalloc.start()
+    tree = cls(root)
+    translate(tree)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+
+    scale = 100_000 / nodes
+    return size / nodes, build * scale, build_translate * scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--xml", help="usa um XML do srcML em vez da amostra sintética")
+    args = parser.parse_args()
+
+    if args.xml:
+        root = etree.parse(args.xml).getroot()
+        nodes = sum(1 for _ in root.iter())
+    else:
+        root, nodes = build_sample(args.nodes)
+    print(f"{nodes} nós")
+    print(f"{'backend':<10} {'bytes/nó':>10} {'build ms/100k':>14} {'+translate ms/100k':>19}")
+    for label, cls in (("legacy", LegacyTag), ("compact", Tag), ("lazy", LazyTag)):
+        per_node, build, build_translate = measure(cls, root, nodes, args.repeat)
+        print(f"{label:<10} {per_node:>10.0f} {build * 1000:>14.1f} {build_translate * 1000:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
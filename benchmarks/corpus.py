@@ -0,0 +1,395 @@
+"""
+Gerador determinístico de código C e do srcML correspondente, para benchmarks.
+
+Uso: python -m benchmarks.corpus saida/ [--size 1000] [--seed 0] [--shape declarations ...]
+
+Cada forma gera <forma>.c e <forma>.c.xml. O XML é escrito junto com o código,
+no mesmo formato do `srcml --position` (posições linha:coluna, type ref="prev",
+<index> dentro de <name>...), então não é preciso ter o srcML instalado.
+Mesma forma, tamanho e semente dão sempre os mesmos bytes.
+"""
+import argparse
+import random
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+HEADER = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+          '<unit xmlns="http://www.srcML.org/srcML/src" xmlns:pos="http://www.srcML.org/srcML/position" '
+          'revision="1.0.0" language="C" filename="{filename}" pos:tabs="8">')
+
+BASE_TYPES = [["int"], ["char"], ["unsigned", "long"], ["double"], ["short"]]
+
+
+class SrcmlWriter:
+    """
+    Escreve código C e marcação srcML ao mesmo tempo. pos:start/pos:end de cada
+    elemento são o primeiro e o último caractere não branco dentro dele.
+    """
+
+    def __init__(self):
+        self.source = []
+        self.xml = []
+        self.line, self.col = 1, 1
+        self.last = None    # posição do último caractere não branco
+        self.stack = []     # [índice da tag de abertura no xml, nome, atributos, início]
+
+    def text(self, text):
+        for char in text:
+            if char == "\n":
+                self.line, self.col = self.line + 1, 1
+                continue
+            if not char.isspace():
+                position = (self.line, self.col)
+                for frame in reversed(self.stack):
+                    if frame[3] is not None:
+                        break
+                    frame[3] = position
+                self.last = position
+            self.col += 1
+        self.source.append(text)
+        self.xml.append(escape(text))
+
+    def open(self, name, **attrib):
+        self.stack.append([len(self.xml), name, attrib, None])
+        self.xml.append(None)  # preenchida no close, quando as posições são conhecidas
+
+    def close(self, start=None, end=None):
+        index, name, attrib, first = self.stack.pop()
+        start, end = start or first, end or self.last
+        attributes = "".join(f" {key}={quoteattr(value)}" for key, value in attrib.items())
+        attributes += f' pos:start="{start[0]}:{start[1]}" pos:end="{end[0]}:{end[1]}"'
+        if index == len(self.xml) - 1:
+            self.xml[index] = f"<{name}{attributes}/>"
+        else:
+            self.xml[index] = f"<{name}{attributes}>"
+            self.xml.append(f"</{name}>")
+
+    def elem(self, name, text, **attrib):
+        self.open(name, **attrib)
+        self.text(text)
+        self.close()
+
+    def position(self):
+        return self.line, self.col
+
+    def result(self, filename):
+        xml = HEADER.format(filename=filename) + "".join(self.xml) + "</unit>\n"
+        return "".join(self.source), xml.encode("utf-8")
+
+
+def write_type(w, words, pointers=0, const_pointer=False, end=None):
+    w.open("type")
+    for i, word in enumerate(words):
+        if i:
+            w.text(" ")
+        if word == "const":
+            w.elem("specifier", word)
+        else:
+            w.elem("name", word)
+    if pointers:
+        w.text(" ")
+        for _ in range(pointers):
+            w.elem("modifier", "*")
+        if const_pointer:
+            w.elem("specifier", "const")
+    w.close(end=end)
+
+
+def write_literal(w, value, before_sign=False):
+    w.open("literal", type="number")
+    w.text(str(value))
+    # Como o srcML: número seguido de " +"/" -" termina na coluna do operador
+    w.close(end=(w.line, w.col + 1) if before_sign else None)
+
+
+def write_init_expr(w, value):
+    w.open("init")
+    w.text("= ")
+    w.open("expr")
+    write_literal(w, value)
+    w.close()
+    w.close()
+
+
+def shape_declarations(w, rng, size):
+    """`size` decl_stmt, alguns com vários declaradores (type ref="prev")."""
+    for i in range(size):
+        w.open("decl_stmt")
+        type_start = w.position()
+        words = rng.choice(BASE_TYPES)
+        count = rng.choice((1, 1, 1, 2, 3))
+        for j in range(count):
+            if j:
+                w.text(", ")
+            w.open("decl")
+            if j == 0:
+                write_type(w, words)
+                type_end = w.last
+                w.text(" ")
+            else:
+                w.open("type", ref="prev")
+                w.close(type_start, type_end)
+            w.elem("name", f"v{i}_{j}")
+            if rng.random() < 0.7:
+                w.text(" ")
+                write_init_expr(w, rng.randrange(1000))
+            w.close()
+        w.text(";")
+        w.close()
+        w.text("\n")
+
+
+def write_block(w, rng, depth, breadth):
+    w.open("block")
+    w.text("{")
+    for i in range(breadth):
+        if i:
+            w.text(", ")
+        w.open("expr")
+        if depth > 1:
+            write_block(w, rng, depth - 1, breadth)
+        else:
+            write_literal(w, rng.randrange(100))
+        w.close()
+    w.text("}")
+    w.close()
+
+
+def shape_deep_arrays(w, rng, size):
+    """Arrays com inicializadores aninhados; a profundidade cresce com `size`."""
+    depth = max(1, min(12, size.bit_length() // 2))
+    for i in range(max(1, size // 2 ** depth)):
+        w.open("decl_stmt")
+        w.open("decl")
+        write_type(w, ["int"])
+        w.text(" ")
+        w.open("name")
+        w.elem("name", f"m{i}")
+        for _ in range(depth):
+            w.open("index")
+            w.text("[")
+            w.open("expr")
+            write_literal(w, 2)
+            w.close()
+            w.text("]")
+            w.close()
+        w.close()
+        w.text(" ")
+        w.open("init")
+        w.text("= ")
+        w.open("expr")
+        write_block(w, rng, depth, 2)
+        w.close()
+        w.close()
+        w.close()
+        w.text(";")
+        w.close()
+        w.text("\n")
+
+
+def shape_long_expressions(w, rng, size):
+    """Declarações com expressões de `size` operandos."""
+    for i in range(max(1, size // 100) or 1):
+        w.open("decl_stmt")
+        w.open("decl")
+        write_type(w, ["int"])
+        w.text(" ")
+        w.elem("name", f"e{i}")
+        w.text(" ")
+        w.open("init")
+        w.text("= ")
+        w.open("expr")
+        operands = min(size, 100)
+        operators = [rng.choice("+-*/") for _ in range(operands - 1)] + [None]
+        for j in range(operands):
+            if j:
+                w.text(" ")
+                w.elem("operator", operators[j - 1])
+                w.text(" ")
+            if rng.random() < 0.5:
+                w.elem("name", f"a{rng.randrange(50)}")
+            else:
+                write_literal(w, rng.randrange(1, 100), operators[j] in ("+", "-"))
+        w.close()
+        w.close()
+        w.close()
+        w.text(";")
+        w.close()
+        w.text("\n")
+
+
+def write_parameter(w, words, pointers, name, several):
+    w.open("parameter")
+    w.open("decl")
+    end = None
+    if several:
+        # Como o srcML: com mais de um parâmetro, o <type> termina junto com o nome
+        type_text = " ".join(words) + (" " + "*" * pointers if pointers else " ")
+        end = (w.line, w.col + len(type_text) + len(name) - 1)
+    write_type(w, words, pointers, end=end)
+    if not pointers:
+        w.text(" ")
+    w.elem("name", name)
+    w.close()
+    w.close()
+
+
+def shape_functions(w, rng, size):
+    """`size` funções pequenas: parâmetros, uma declaração e um return com chamada."""
+    for i in range(size):
+        w.open("function")
+        write_type(w, ["int"])
+        w.text(" ")
+        w.elem("name", f"f{i}")
+        w.open("parameter_list")
+        w.text("(")
+        params = [f"p{j}" for j in range(rng.randrange(1, 4))]
+        for j, param in enumerate(params):
+            if j:
+                w.text(", ")
+            write_parameter(w, rng.choice(BASE_TYPES), rng.choice((0, 0, 1)), param, len(params) > 1)
+        w.text(")")
+        w.close()
+        w.text(" ")
+        w.open("block")
+        w.text("{")
+        w.open("block_content")
+        w.text("\n    ")
+
+        w.open("decl_stmt")
+        w.open("decl")
+        write_type(w, ["int"])
+        w.text(" ")
+        w.elem("name", "x")
+        w.text(" ")
+        w.open("init")
+        w.text("= ")
+        w.open("expr")
+        w.elem("name", params[0])
+        w.text(" ")
+        w.elem("operator", "+")
+        w.text(" ")
+        write_literal(w, rng.randrange(10))
+        w.close()
+        w.close()
+        w.close()
+        w.text(";")
+        w.close()
+        w.text("\n    ")
+
+        w.open("return")
+        w.text("return ")
+        w.open("expr")
+        w.open("call")
+        w.elem("name", f"f{rng.randrange(i + 1)}")
+        w.open("argument_list")
+        w.text("(")
+        for j, name in enumerate(["x"] + params[1:]):
+            if j:
+                w.text(", ")
+            w.open("argument")
+            w.open("expr")
+            w.elem("name", name)
+            w.close()
+            w.close()
+        w.text(")")
+        w.close()
+        w.close()
+        w.close()
+        w.text(";")
+        w.close()
+
+        w.text("\n")
+        w.close()
+        w.text("}")
+        w.close()
+        w.close()
+        w.text("\n")
+
+
+def shape_pointers(w, rng, size):
+    """Declarações com tipos cheios de ponteiros e const."""
+    for i in range(size):
+        words = (["const"] if rng.random() < 0.5 else []) + rng.choice(BASE_TYPES)
+        w.open("decl_stmt")
+        w.open("decl")
+        write_type(w, words, rng.randrange(1, 4), rng.random() < 0.3)
+        w.text(" ")
+        w.elem("name", f"p{i}")
+        if rng.random() < 0.5:
+            w.text(" ")
+            write_init_expr(w, 0)
+        w.close()
+        w.text(";")
+        w.close()
+        w.text("\n")
+
+
+def shape_blobs(w, rng, size):
+    """Uma tabela `const uint8_t blob[]` com `size` bytes em hexadecimal, 16 por linha."""
+    w.open("decl_stmt")
+    w.open("decl")
+    write_type(w, ["const", "uint8_t"])
+    w.text(" ")
+    w.open("name")
+    w.elem("name", "blob")
+    w.elem("index", "[]")
+    w.close()
+    w.text(" ")
+    w.open("init")
+    w.text("= ")
+    w.open("expr")
+    w.open("block")
+    w.text("{\n    ")
+    for i in range(size):
+        if i:
+            w.text(",\n    " if i % 16 == 0 else ", ")
+        w.open("expr")
+        w.elem("literal", f"0x{rng.randrange(256):02x}", type="number")
+        w.close()
+    w.text("\n}")
+    w.close()
+    w.close()
+    w.close()
+    w.close()
+    w.text(";")
+    w.close()
+    w.text("\n")
+
+
+SHAPES = {
+    "blobs": shape_blobs,
+    "declarations": shape_declarations,
+    "deep_arrays": shape_deep_arrays,
+    "long_expressions": shape_long_expressions,
+    "functions": shape_functions,
+    "pointers": shape_pointers,
+}
+
+
+def generate(shape, size, seed=0):
+    """Devolve (código C, XML do srcML em bytes) da forma `shape` com tamanho `size`."""
+    writer = SrcmlWriter()
+    SHAPES[shape](writer, random.Random(f"{shape}:{size}:{seed}"), size)
+    return writer.result(f"{shape}.c")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shape", nargs="+", choices=sorted(SHAPES), default=sorted(SHAPES))
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    for shape in args.shape:
+        source, xml = generate(shape, args.size, args.seed)
+        (output / f"{shape}.c").write_text(source)
+        (output / f"{shape}.c.xml").write_bytes(xml)
+        print(f"{shape:<18} {len(source):>10} bytes de C, {len(xml):>10} bytes de XML")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Suíte de benchmarks por estágio sobre o corpus sintético de benchmarks.corpus.
+
+Uso: python -m benchmarks.suite [--size 1000 10000] [--shape functions ...] [--repeat 5]
+                                [--output resultados.json] [--compare anterior.json]
+
+Para cada forma e tamanho mede, separadamente:
+    generate_tag   XML -> árvore de Tag
+    translate      árvore -> .clearly
+    srcml          código C -> XML (subprocesso do srcML)
+    end_to_end     código C -> .clearly (srcML + árvore + tradução)
+
+Os estágios com srcML são pulados (seconds = null) quando ele não roda. O
+resultado é JSON (melhor tempo de --repeat execuções) para comparar commits
+com --compare.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import SHAPES, generate
+from source.pipeline import c_to_tag
+from source.srcml import SRCML_FLAGS, srcml_command, srcml_env, srcml_version
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+STAGES = ("generate_tag", "translate", "srcml", "end_to_end")
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_srcml(c_path):
+    subprocess.run(srcml_command(*SRCML_FLAGS, str(c_path)), env=srcml_env(), check=True, capture_output=True)
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=Path(__file__).parent)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def detect_srcml():
+    try:
+        return srcml_version()
+    except (OSError, subprocess.CalledProcessError, IndexError):
+        return None
+
+
+def measure(shape, size, seed, repeat, directory, use_srcml):
+    source, xml = generate(shape, size, seed)
+    c_path = directory / f"{shape}-{size}.c"
+    xml_path = directory / f"{shape}-{size}.c.xml"
+    c_path.write_text(source)
+    xml_path.write_bytes(xml)
+
+    tag = generate_tag(str(xml_path))
+    info = {"shape": shape, "size": size, "nodes": sum(1 for _ in tag.walk()), "xml_bytes": len(xml)}
+
+    timings = {
+        "generate_tag": best_time(lambda: generate_tag(str(xml_path)), repeat),
+        "translate": best_time(lambda: translate(tag), repeat),
+        "srcml": None,
+        "end_to_end": None,
+    }
+    if use_srcml:
+        timings["srcml"] = best_time(lambda: run_srcml(c_path), repeat)
+        timings["end_to_end"] = best_time(lambda: translate(c_to_tag(c_path)), repeat)
+
+    return [{**info, "stage": stage, "seconds": timings[stage]} for stage in STAGES]
+
+
+def compare(results, previous):
+    """Linhas "forma tamanho estágio antes depois razão" para as medições em comum."""
+    before = {(r["shape"], r["size"], r["stage"]): r["seconds"] for r in previous["results"]}
+    lines = []
+    for r in results:
+        old = before.get((r["shape"], r["size"], r["stage"]))
+        if old and r["seconds"]:
+            lines.append(f"{r['shape']:<18} {r['size']:>7} {r['stage']:<13} {old * 1000:>10.1f} "
+                         f"{r['seconds'] * 1000:>10.1f} {r['seconds'] / old:>7.2f}x")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, nargs="+", default=[1000])
+    parser.add_argument("--shape", nargs="+", choices=sorted(SHAPES), default=sorted(SHAPES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="arquivo JSON de resultados")
+    parser.add_argument("--compare", help="JSON de uma execução anterior")
+    parser.add_argument("--no-srcml", action="store_true", help="não mede os estágios com srcML")
+    args = parser.parse_args()
+
+    srcml = None if args.no_srcml else detect_srcml()
+    results = []
+    print(f"{'forma':<18} {'tamanho':>7} {'nós':>9} " + " ".join(f"{stage:>13}" for stage in STAGES) + "  (ms)")
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in args.shape:
+            for size in args.size:
+                rows = measure(shape, size, args.seed, args.repeat, Path(directory), srcml is not None)
+                results += rows
+                cells = " ".join(f"{row['seconds'] * 1000:>13.1f}" if row["seconds"] is not None else f"{'-':>13}"
+                                 for row in rows)
+                print(f"{shape:<18} {size:>7} {rows[0]['nodes']:>9} {cells}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "srcml": srcml,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+        print(f"\ncomparado com {previous['meta'].get('commit') or args.compare}")
+        print(f"{'forma':<18} {'tamanho':>7} {'estágio':<13} {'antes ms':>10} {'agora ms':>10} {'razão':>8}")
+        print("\n".join(compare(results, previous)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Pipeline assíncrono C -> .clearly em três estágios ligados por filas limitadas:
+
+    srcML (subprocessos asyncio) -> tradução (executor) -> escrita (threads)
+
+Enquanto um srcML roda, arquivos anteriores já estão sendo traduzidos e
+escritos. As filas limitadas seguram o estágio rápido quando o seguinte atrasa
+(backpressure), então a memória não cresce com o tamanho da árvore. No fim,
+cada estágio informa quanto tempo ficou ocupado, esperando entrada e
+bloqueado na saída.
+"""
+import asyncio
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from source.pipeline import JobTimeout, time_limit
+from source.srcml import SRCML_FLAGS, srcml_command, srcml_env
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+DONE = None  # sentinela de fim de fila
+
+
+class StageStats:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0     # trabalhando
+        self.starved = 0.0  # esperando entrada
+        self.blocked = 0.0  # esperando espaço na fila seguinte
+
+    def utilization(self, wall):
+        return self.busy / (wall * self.workers) if wall else 0.0
+
+
+class PipelineReport:
+    def __init__(self, stages):
+        self.stages = stages
+        self.results = {}  # caminho -> None (ok) ou mensagem de erro
+        self.wall = 0.0
+
+    @property
+    def failures(self):
+        return {path: error for path, error in self.results.items() if error is not None}
+
+    def format(self):
+        lines = [f"{'estágio':<10} {'trab.':>5} {'itens':>6} {'ocupado':>8} {'sem entrada':>12} {'bloqueado':>10}"]
+        for stage in self.stages:
+            scale = self.wall * stage.workers or 1
+            lines.append(f"{stage.name:<10} {stage.workers:>5} {stage.items:>6} {stage.utilization(self.wall):>8.0%}"
+                         f" {stage.starved / scale:>12.0%} {stage.blocked / scale:>10.0%}")
+        lines.append(f"total {self.wall:.2f}s, {len(self.results)} arquivo(s), {len(self.failures)} falha(s)")
+        return "\n".join(lines)
+
+
+def translate_xml(xml: bytes, timeout=None) -> str:
+    """
+    Estágio de tradução (roda no executor): XML do srcML -> .clearly. O tempo
+    limite é um SIGALRM no próprio trabalhador, que interrompe a tradução; só
+    vale num executor de processos (nas threads o sinal não chega).
+    """
+    try:
+        with time_limit(timeout):
+            return translate(generate_tag(io.BytesIO(xml)))
+    except JobTimeout:
+        raise TimeoutError(f"mais de {timeout:g}s") from None
+
+
+async def _timed_get(queue, stats):
+    start = time.perf_counter()
+    item = await queue.get()
+    stats.starved += time.perf_counter() - start
+    return item
+
+
+async def _timed_put(queue, item, stats):
+    start = time.perf_counter()
+    await queue.put(item)
+    stats.blocked += time.perf_counter() - start
+
+
+async def _run_srcml(path, timeout):
+    """XML do srcML para `path`; None e a mensagem de erro se falhou."""
+    process = await asyncio.create_subprocess_exec(
+        *srcml_command(*SRCML_FLAGS, str(path)), env=srcml_env(),
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        xml, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return None, f"timeout: mais de {timeout:g}s"
+    if process.returncode:
+        return None, f"srcML saiu com {process.returncode}: {stderr.decode(errors='replace').strip()}"
+    return xml, None
+
+
+async def _srcml_worker(paths, parsed, stats, report, timeout, cache):
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            if cache is not None:
+                source = await asyncio.to_thread(path.read_bytes)
+                xml = await asyncio.to_thread(cache.get, source)
+                error = None
+                if xml is None:
+                    xml, error = await _run_srcml(path, timeout)
+                    if xml is not None:
+                        await asyncio.to_thread(cache.put, source, xml)
+            else:
+                xml, error = await _run_srcml(path, timeout)
+        except Exception as exc:
+            # Inclui falhas do cache (srcml --version, XML corrompido): só este arquivo falha
+            report.results[path] = f"{type(exc).__name__}: {exc}"
+            continue
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.busy += elapsed
+            stats.items += 1
+
+        if error is None and timeout and elapsed >= timeout:
+            error = f"timeout: mais de {timeout:g}s"
+        if error is not None:
+            report.results[path] = error
+            continue
+        # O tempo limite é por arquivo: a tradução fica com o que o srcML não usou
+        await _timed_put(parsed, (path, xml, timeout and timeout - elapsed), stats)
+
+
+async def _translate_worker(parsed, written, executor, stats, report):
+    loop = asyncio.get_running_loop()
+    while (item := await _timed_get(parsed, stats)) is not DONE:
+        path, xml, timeout = item
+        start = time.perf_counter()
+        try:
+            text = await loop.run_in_executor(executor, translate_xml, xml, timeout)
+        except TimeoutError as exc:
+            report.results[path] = f"timeout: {exc}"
+            continue
+        except Exception as exc:
+            report.results[path] = f"{type(exc).__name__}: {exc}"
+            continue
+        finally:
+            stats.busy += time.perf_counter() - start
+            stats.items += 1
+        await _timed_put(written, (path, text), stats)
+
+
+def _write(output, text):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(text, encoding="utf-8")
+
+
+async def _write_worker(written, output_for, stats, report):
+    while (item := await _timed_get(written, stats)) is not DONE:
+        path, text = item
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(_write, output_for(path), text)
+            report.results[path] = None
+        except OSError as exc:
+            report.results[path] = f"{type(exc).__name__}: {exc}"
+        stats.busy += time.perf_counter() - start
+        stats.items += 1
+
+
+async def run_pipeline(paths, output_for, srcml_jobs=None, translate_jobs=None, write_jobs=2,
+                       queue_size=None, executor=None, timeout=None, cache=None) -> PipelineReport:
+    """
+    Converte `paths` escrevendo cada resultado em output_for(path). Falhas por
+    arquivo ficam em report.results e não interrompem os demais. `timeout`
+    (segundos por arquivo, srcML + tradução) e `cache` (SrcmlCache) valem como
+    em main.translate_tree.
+    """
+    cores = os.cpu_count() or 1
+    srcml_jobs = srcml_jobs or cores
+    translate_jobs = translate_jobs or cores
+    queue_size = queue_size or 2 * translate_jobs
+
+    stages = [StageStats("srcml", srcml_jobs), StageStats("tradução", translate_jobs), StageStats("escrita", write_jobs)]
+    report = PipelineReport(stages)
+    parsed = asyncio.Queue(queue_size)
+    written = asyncio.Queue(queue_size)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(translate_jobs)
+
+    start = time.perf_counter()
+    try:
+        # Os trabalhadores do srcML compartilham um iterador: cada arquivo sai uma vez só
+        pending = iter(paths)
+        srcml = [asyncio.create_task(_srcml_worker(pending, parsed, stages[0], report, timeout, cache)) for _ in range(srcml_jobs)]
+        translators = [asyncio.create_task(_translate_worker(parsed, written, executor, stages[1], report))
+                       for _ in range(translate_jobs)]
+        writers = [asyncio.create_task(_write_worker(written, output_for, stages[2], report)) for _ in range(write_jobs)]
+
+        await asyncio.gather(*srcml)
+        for _ in translators:
+            await parsed.put(DONE)
+        await asyncio.gather(*translators)
+        for _ in writers:
+            await written.put(DONE)
+        await asyncio.gather(*writers)
+    finally:
+        if own_executor:
+            executor.shutdown()
+    report.wall = time.perf_counter() - start
+    return report
@@ -1,22 +1,126 @@
+import argparse
+import io
 import subprocess
-import os
 from pathlib import Path
 
-def c2xml(name):
-    root = Path(__file__).parent.parent
-    appimage = root / "srcml" / "srcml-x86_64.AppImage"
-    arquivo_c = root / f"{name}"
-    arquivo_xml = root / f"{name}.xml"
+from lxml import etree
+
+from source.srcml import SRCML_FLAGS, srcml_command, srcml_env
+from source.srcml_cache import SrcmlCache
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import Tag, generate_tag, iter_archive_elements
+
+ROOT = Path(__file__).parent.parent
 
-    env = os.environ.copy()
-    env["APPIMAGE_EXTRACT_AND_RUN"] = "1"
+C_SUFFIXES = (".c", ".h")
+ARCHIVE_FLAGS = ("--archive",)
+
+# Arquivos por execução do srcML: limita o tamanho da linha de comando e do archive em memória
+DEFAULT_CHUNK_SIZE = 500
+
+
+def c2xml(name):
+    arquivo_c = ROOT / f"{name}"
+    arquivo_xml = ROOT / f"{name}.xml"
 
     subprocess.run(
-        [str(appimage), str(arquivo_c), "--position", "-o", str(arquivo_xml)],
-        env=env,
+        srcml_command(str(arquivo_c), "--position", "-o", str(arquivo_xml)),
+        env=srcml_env(),
         check=True
     )
     print("\033[1;33mWARNING: If there are syntax errors in C, srcML will generate corrupted XML, resulting in a corrupted .clearly file! Ensure the syntax of your C code is correct by running it with your preferred compiler.")
     print(f"\033[1;32m✅ arquivo.xml gerado com sucesso em: {arquivo_xml}")
 
-c2xml("arquivo.c")
+
+def collect_c_files(paths):
+    """Expande diretórios (recursivamente, em ordem) nos arquivos .c/.h que contêm."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files += sorted(p for p in path.rglob("*") if p.suffix in C_SUFFIXES and p.is_file())
+        else:
+            files.append(path)
+    return files
+
+
+def output_path(path: Path, source_root: Path, output_root: Path) -> Path:
+    """Caminho do .clearly espelhando `path` (relativo a `source_root`) em `output_root`."""
+    relative = path.relative_to(source_root) if source_root.is_dir() else Path(path.name)
+    return output_root / f"{relative}.clearly"
+
+
+def c2xml_batch(paths, chunk_size=DEFAULT_CHUNK_SIZE, cache=None):
+    """
+    Converte vários arquivos C com uma execução do srcML por bloco de `chunk_size`
+    arquivos, em vez de uma por arquivo. O archive gerado é lido direto do stdout
+    e separado em unidades: gera (filename, Tag) prontos para translate.
+    Com `cache` (SrcmlCache), arquivos já vistos saem do cache sem passar pelo
+    srcML e os novos são guardados nele.
+    """
+    files = collect_c_files(paths)
+
+    for start in range(0, len(files), chunk_size):
+        chunk = files[start:start + chunk_size]
+
+        # Acertos do cache por posição; as faltas vão para o srcML na mesma ordem
+        cached, sources, missing = {}, {}, []
+        for path in chunk:
+            if cache is not None:
+                source = path.read_bytes()
+                xml = cache.get(source, ARCHIVE_FLAGS)
+                if xml is not None:
+                    cached[path] = xml
+                    continue
+                sources[str(path)] = source
+            missing.append(path)
+
+        process = units = None
+        if missing:
+            # --archive mesmo com um arquivo só, para a saída ter sempre o mesmo formato
+            command = srcml_command(*ARCHIVE_FLAGS, *SRCML_FLAGS, *map(str, missing))
+            process = subprocess.Popen(command, env=srcml_env(), stdout=subprocess.PIPE)
+            units = iter_archive_elements(process.stdout)
+        try:
+            # Na ordem da entrada: o srcML devolve as unidades na ordem da linha de comando
+            for path in chunk:
+                if path in cached:
+                    yield str(path), generate_tag(io.BytesIO(cached.pop(path)))
+                    continue
+                elem = next(units, None)
+                if elem is None:
+                    break  # srcML parou antes; o código de saída diz por quê
+                filename = elem.get("filename")
+                if cache is not None:
+                    # A unidade de um archive é guardada com a chave do --archive, não com a do arquivo avulso
+                    cache.put(sources.pop(filename), etree.tostring(elem), ARCHIVE_FLAGS)
+                yield filename, Tag(elem)
+        finally:
+            if process is not None:
+                process.stdout.close()
+                returncode = process.wait()
+        if process is not None and returncode:
+            raise subprocess.CalledProcessError(returncode, command)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte arquivos C (ou diretórios) em .clearly usando uma execução do srcML por bloco.")
+    parser.add_argument("paths", nargs="+", help="arquivos .c/.h ou diretórios")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="arquivos por execução do srcML")
+    parser.add_argument("--no-cache", action="store_true", help="sempre roda o srcML, sem o cache de XML")
+    args = parser.parse_args(argv)
+
+    cache = None if args.no_cache else SrcmlCache()
+    count = 0
+    for filename, unit in c2xml_batch(args.paths, args.chunk_size, cache):
+        arquivo_clearly = Path(f"{filename}.clearly")
+        arquivo_clearly.write_text(translate(unit), encoding="utf-8")
+        count += 1
+
+    print(f"\033[1;32m✅ {count} arquivo(s) .clearly gerado(s)")
+    if cache is not None:
+        print(f"cache do srcML: {cache.stats['hits']} acerto(s), {cache.stats['misses']} falta(s), "
+              f"{cache.stats['evictions']} despejo(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,228 @@
-from source.xml2clearly.xml_manager import generate_tag
-from source.xml2clearly.translate import translate
+"""
+Traduz uma árvore de código C para .clearly em paralelo.
 
-# Carrega o XML gerado pelo srcML
-xml = generate_tag("arquivo.c.xml")
+Uso: python -m source.main src/ -o saida/ [--jobs N] [--timeout 60] [--srcml-jobs K] [--async]
 
-# Traduz o nó raiz (ou qualquer tag específica)
-saida = translate(xml)
+Cada arquivo .c/.h vira <saida>/<caminho relativo>.clearly. Os arquivos são
+distribuídos num ProcessPoolExecutor; cada um tem seu tempo limite e uma falha
+(erro de sintaxe, srcML quebrado, tempo esgotado) não interrompe os outros.
+Com --async, usa o pipeline em estágios de source.async_pipeline; com --watch,
+fica vigiando a árvore e retraduz cada arquivo salvo (source.watch). Com
+--profile, traduz no próprio processo, um arquivo por vez, e imprime o tempo
+gasto em cada tradutor (source.xml2clearly.profiling).
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
 
-print(saida)
+from source.async_pipeline import run_pipeline
+from source.c2xml import collect_c_files, output_path
+from source.pipeline import JobTimeout, c_to_tag, time_limit
+from source.srcml import limit_concurrency
+from source.srcml_cache import SrcmlCache
+from source.watch import DEFAULT_DEBOUNCE, watch
+from source.xml2clearly import profiling
+from source.xml2clearly.emitter import Emitter
+from source.xml2clearly.translate import emit
+
+# Cache de XML do processo trabalhador (criado no initializer)
+_cache = None
+
+
+def _init_worker(semaphore, use_cache):
+    global _cache
+    limit_concurrency(semaphore)
+    _cache = SrcmlCache() if use_cache else None
+
+
+def write_translation(tag, output: Path):
+    """
+    Escreve a tradução de `tag` em `output` em streaming (emit), sem montar o
+    texto inteiro. Vai para um temporário renomeado no fim: uma falha no meio
+    não deixa um .clearly pela metade.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as file:
+            out = Emitter(file)
+            emit(tag, out)
+            out.flush()
+        os.replace(tmp, output)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def translate_file(path, output, timeout=None):
+    """
+    Converte um arquivo C e escreve o .clearly. Devolve (status, detalhe,
+    segundos), com status "ok", "timeout" ou "error"; nunca levanta.
+    """
+    start = time.perf_counter()
+    # O tempo limite vale para srcML + tradução; ao estourar, o srcML em curso é morto
+    try:
+        with time_limit(timeout):
+            write_translation(c_to_tag(Path(path), cache=_cache), Path(output))
+        status, detail = "ok", ""
+    except JobTimeout:
+        status, detail = "timeout", f"mais de {timeout:g}s"
+    except Exception as exc:
+        status, detail = "error", f"{type(exc).__name__}: {exc}"
+    return status, detail, time.perf_counter() - start
+
+
+def translate_tree(source_root, output_root, jobs=None, timeout=None, srcml_jobs=None, use_cache=True, report=None):
+    """
+    Traduz todos os .c/.h de `source_root` em paralelo. Devolve {caminho: (status,
+    detalhe, segundos)}. `report(path, result)` é chamado a cada arquivo concluído.
+    Se um trabalhador morre (ex.: segfault), os arquivos que estavam em curso
+    são refeitos um a um para isolar o culpado.
+    """
+    source_root, output_root = Path(source_root), Path(output_root)
+    jobs = jobs or os.cpu_count() or 1
+    srcml_jobs = srcml_jobs or jobs
+    files = collect_c_files([source_root])
+    targets = {path: output_path(path, source_root, output_root) for path in files}
+    results = {}
+
+    def finish(path, result):
+        results[path] = result
+        if report:
+            report(path, result)
+
+    semaphore = multiprocessing.Semaphore(srcml_jobs)
+    remaining = files
+    while remaining:
+        suspects, remaining = _run_pool(remaining, targets, jobs, timeout, semaphore, use_cache, finish)
+
+        # Cada suspeito sozinho num trabalhador: quem derrubar o pool é o culpado
+        for path in suspects:
+            crashed, _ = _run_pool([path], targets, 1, timeout, semaphore, use_cache, finish)
+            if crashed:
+                finish(path, ("error", "o processo trabalhador morreu", 0.0))
+    return results
+
+
+def _run_pool(files, targets, jobs, timeout, semaphore, use_cache, finish):
+    """
+    Roda `files` num pool. Se o pool quebrar, devolve (arquivos que estavam em
+    curso, arquivos nem enviados); senão ([], []).
+    """
+    pending = iter(files)
+    running = {}
+    # Janela limitada de tarefas em voo: não serializa 20k tarefas de uma vez
+    window = 2 * jobs
+
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(semaphore, use_cache)) as pool:
+        try:
+            while True:
+                while len(running) < window:
+                    path = next(pending, None)
+                    if path is None:
+                        break
+                    running[pool.submit(translate_file, path, targets[path], timeout)] = path
+                if not running:
+                    return [], []
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    finish(running.pop(future), result)
+        except BrokenProcessPool:
+            return list(running.values()), list(pending)
+
+
+def profile_tree(source_root, output_root, timeout=None, use_cache=True, report=None):
+    """
+    Como translate_tree, mas no próprio processo e com a instrumentação dos
+    tradutores ligada: os contadores ficam todos num lugar só. Imprime o relatório.
+    """
+    source_root, output_root = Path(source_root), Path(output_root)
+    _init_worker(None, use_cache)
+    results = {}
+    profiling.enable()
+    try:
+        for path in collect_c_files([source_root]):
+            results[path] = translate_file(path, output_path(path, source_root, output_root), timeout)
+            if report:
+                report(path, results[path])
+    finally:
+        profiling.disable()
+    print(profiling.format_report())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traduz uma árvore de código C para .clearly em paralelo.")
+    parser.add_argument("source", help="diretório (ou arquivo) com o código C")
+    parser.add_argument("-o", "--output", help="diretório de saída (padrão: ao lado dos fontes)")
+    parser.add_argument("-j", "--jobs", type=int, help="processos trabalhadores (padrão: núcleos)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="segundos por arquivo (0 desliga)")
+    parser.add_argument("--srcml-jobs", type=int, help="execuções simultâneas do srcML (padrão: --jobs)")
+    parser.add_argument("--no-cache", action="store_true", help="sempre roda o srcML, sem o cache de XML")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="pipeline assíncrono srcML -> tradução -> escrita, com relatório por estágio")
+    parser.add_argument("--watch", action="store_true", help="continua rodando e retraduz os arquivos alterados")
+    parser.add_argument("--polling", action="store_true", help="no --watch, varre mtimes em vez de usar inotify")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="no --watch, segundos sem eventos antes de processar um lote")
+    parser.add_argument("--profile", action="store_true",
+                        help="traduz sem paralelismo e mostra chamadas e tempo por tradutor")
+    args = parser.parse_args(argv)
+
+    source = Path(args.source)
+    output = Path(args.output) if args.output else (source if source.is_dir() else source.parent)
+
+    if args.watch:
+        def report_change(path, status, seconds):
+            if status == "ok":
+                print(f"\033[1;32m✅ {path} ({seconds * 1000:.0f} ms)\033[0m")
+            elif status == "removed":
+                print(f"🗑  {path}")
+            else:
+                print(f"\033[1;31m✗ {path}: {status}\033[0m", file=sys.stderr)
+
+        try:
+            watch(source, output, args.debounce, args.polling, report=report_change)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.use_async:
+        files = collect_c_files([source])
+        report = asyncio.run(run_pipeline(files, lambda path: output_path(path, source, output),
+                                          args.srcml_jobs, args.jobs, timeout=args.timeout or None,
+                                          cache=None if args.no_cache else SrcmlCache()))
+        for path, error in report.failures.items():
+            print(f"\033[1;31m✗ {path}: {error}\033[0m", file=sys.stderr)
+        print(report.format())
+        return 1 if report.failures else 0
+
+    def report(path, result):
+        status, detail, _ = result
+        if status != "ok":
+            print(f"\033[1;31m✗ {path}: {status} {detail}\033[0m", file=sys.stderr)
+
+    start = time.perf_counter()
+    if args.profile:
+        results = profile_tree(source, output, args.timeout or None, not args.no_cache, report)
+    else:
+        results = translate_tree(source, output, args.jobs, args.timeout or None, args.srcml_jobs,
+                                 not args.no_cache, report)
+    elapsed = time.perf_counter() - start
+
+    failed = sum(1 for status, _, _ in results.values() if status != "ok")
+    print(f"\033[1;32m✅ {len(results) - failed} arquivo(s) .clearly gerado(s) em {elapsed:.1f}s\033[0m"
+          + (f", {failed} falha(s)" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
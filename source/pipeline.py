@@ -0,0 +1,147 @@
+"""
+Tradução C -> .clearly em memória: o código vai para o srcML pelo stdin (ou
+pelo caminho do arquivo) e o XML do stdout vai direto para o parser do lxml,
+sem .xml intermediário no disco.
+"""
+import io
+import os
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from source.srcml import SRCML_FLAGS, srcml_command, srcml_env, srcml_slot
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+
+class JobTimeout(BaseException):
+    """Tempo do arquivo esgotado. BaseException: os `except Exception` dos tradutores não a engolem."""
+
+
+def _on_timeout(signum, frame):
+    raise JobTimeout
+
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Levanta JobTimeout no bloco depois de `seconds` (SIGALRM). Sem efeito sem
+    `seconds`, fora da thread principal ou sem setitimer (Windows).
+    """
+    alarm = seconds and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _feed(stream, data):
+    try:
+        stream.write(data)
+    except BrokenPipeError:
+        # srcML saiu antes de ler tudo; o erro aparece no código de saída
+        pass
+    finally:
+        stream.close()
+
+
+def _drain(stream, chunks):
+    try:
+        chunks.append(stream.read())
+    finally:
+        stream.close()
+
+
+def srcml_xml(source: bytes = None, filename=None, path=None) -> bytes:
+    """XML do srcML para o código C em `source` (via stdin) ou no arquivo `path`."""
+    if path is not None:
+        command, source = srcml_command(*SRCML_FLAGS, os.fspath(path)), None
+    else:
+        command = srcml_command(*SRCML_FLAGS)
+        if filename:
+            command += ["--filename", filename]
+    with srcml_slot():
+        return subprocess.run(command, env=srcml_env(), input=source, capture_output=True, check=True).stdout
+
+
+def c_to_tag(text_or_path, filename=None, lazy=False, cache=None):
+    """
+    Roda o srcML sobre `text_or_path` e devolve a árvore do <unit>.
+    Path/PathLike é um arquivo C; str é o próprio código C (`filename` vira o
+    atributo filename do <unit>). Com `cache` (SrcmlCache), o srcML só roda
+    para código que ainda não está no cache.
+    """
+    if cache is not None:
+        if isinstance(text_or_path, os.PathLike):
+            source = Path(text_or_path).read_bytes()
+            xml = cache.fetch(source, lambda data: srcml_xml(data, path=text_or_path))
+        else:
+            source = text_or_path.encode("utf-8")
+            xml = cache.fetch(source, lambda data: srcml_xml(data, filename))
+        return generate_tag(io.BytesIO(xml), lazy=lazy)
+
+    if isinstance(text_or_path, os.PathLike):
+        command = srcml_command(*SRCML_FLAGS, os.fspath(text_or_path))
+        source = None
+    else:
+        command = srcml_command(*SRCML_FLAGS)
+        if filename:
+            command += ["--filename", filename]
+        source = text_or_path.encode("utf-8")
+
+    with srcml_slot():
+        return _parse_srcml_output(command, source, lazy)
+
+
+def _parse_srcml_output(command, source, lazy):
+    process = subprocess.Popen(
+        command,
+        env=srcml_env(),
+        stdin=subprocess.PIPE if source is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    # Escreve o código numa thread enquanto o parser consome o stdout: com
+    # fontes grandes os dois pipes enchem e um write/read sequencial travaria
+    writer = None
+    if source is not None:
+        writer = threading.Thread(target=_feed, args=(process.stdin, source), daemon=True)
+        writer.start()
+    # O stderr também é lido em paralelo: se o srcML enche o pipe de diagnósticos,
+    # ele para de escrever o stdout e o parser ficaria esperando para sempre
+    stderr = []
+    reader = threading.Thread(target=_drain, args=(process.stderr, stderr), daemon=True)
+    reader.start()
+
+    try:
+        tag = generate_tag(process.stdout, lazy=lazy)
+    except BaseException:
+        # Inclui interrupções (Ctrl+C, tempo limite): o srcML não pode ficar órfão
+        process.kill()
+        returncode = process.wait()
+        reader.join()
+        if returncode > 0:
+            raise subprocess.CalledProcessError(returncode, command, stderr=b"".join(stderr))
+        raise
+    finally:
+        if writer is not None:
+            writer.join()
+        process.stdout.close()
+
+    returncode = process.wait()
+    reader.join()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, command, stderr=b"".join(stderr))
+    return tag
+
+
+def translate_c_source(text_or_path, filename=None, cache=None) -> str:
+    """Traduz código C (str) ou um arquivo C (Path) para .clearly, sem arquivos temporários."""
+    return translate(c_to_tag(text_or_path, filename, cache=cache))
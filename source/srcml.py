@@ -0,0 +1,166 @@
+"""
+Executável do srcML usado por c2xml e xml2c.
+
+Com APPIMAGE_EXTRACT_AND_RUN=1 o AppImage se descompacta num diretório
+temporário a cada execução. Aqui ele é extraído uma vez para um cache em disco
+(chaveado pelo hash do AppImage) e as execuções seguintes chamam o AppRun
+extraído direto.
+"""
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+APPIMAGE = ROOT / "srcml" / "srcml-x86_64.AppImage"
+
+# Flags de C -> srcML usadas em todo o pipeline (e parte da chave do cache de XML)
+SRCML_FLAGS = ("--position", "-l", "C")
+
+# Caminho de um srcML já instalado; tem precedência sobre o AppImage
+SRCML_ENV_VAR = "CCLEARLY_SRCML"
+
+# (tamanho, mtime) do AppImage -> executável extraído, para não reler o carimbo a cada chamada
+_resolved = {}
+
+# Semáforo (compartilhado entre processos) que limita execuções simultâneas do srcML
+_slots = None
+
+
+def cache_root() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "cclearly"
+
+
+def cache_dir() -> Path:
+    return cache_root() / "srcml"
+
+
+def file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stamp_path(cache, appimage):
+    # Um carimbo por caminho de AppImage: vários checkouts compartilham o cache
+    name = hashlib.sha1(str(appimage).encode()).hexdigest()
+    return cache / "stamps" / f"{name}.json"
+
+
+def _read_stamp(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_stamp(path, stamp):
+    # Escreve num temporário e renomeia: outro processo nunca lê um carimbo pela metade
+    path.parent.mkdir(exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as file:
+        json.dump(stamp, file)
+    os.replace(tmp, path)
+
+
+def _extract(appimage, target):
+    """Extrai o AppImage em `target` (--appimage-extract gera ./squashfs-root no cwd)."""
+    work = Path(tempfile.mkdtemp(dir=target.parent, prefix=".extract-"))
+    try:
+        subprocess.run([str(appimage), "--appimage-extract"], cwd=work, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            os.rename(work / "squashfs-root", target)
+        except OSError:
+            # Outro processo extraiu a mesma versão antes: usa a dele
+            if not target.is_dir():
+                raise
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def extracted_srcml(appimage=APPIMAGE) -> Path:
+    """
+    Devolve o AppRun do AppImage extraído no cache, extraindo só quando o
+    AppImage mudou. Tamanho e mtime iguais ao carimbo dispensam recalcular o hash.
+    """
+    stat = os.stat(appimage)
+    key = (str(appimage), stat.st_size, stat.st_mtime_ns)
+    apprun = _resolved.get(key)
+    if apprun is not None and apprun.exists():
+        return apprun
+
+    cache = cache_dir()
+    cache.mkdir(parents=True, exist_ok=True)
+
+    stamp_path = _stamp_path(cache, appimage)
+    stamp = _read_stamp(stamp_path)
+    current = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if stamp and all(stamp.get(k) == v for k, v in current.items()):
+        digest = stamp["hash"]
+    else:
+        digest = file_hash(appimage)
+        stamp = None
+
+    target = cache / digest
+    apprun = target / "AppRun"
+    if not apprun.exists():
+        if target.exists():
+            # Extração incompleta de uma execução interrompida
+            shutil.rmtree(target)
+        _extract(appimage, target)
+
+    if stamp is None:
+        _write_stamp(stamp_path, {**current, "hash": digest})
+
+    _resolved[key] = apprun
+    return apprun
+
+
+def srcml_command(*args) -> list:
+    """Linha de comando do srcML com `args`."""
+    installed = os.environ.get(SRCML_ENV_VAR)
+    if installed:
+        return [installed, *args]
+
+    try:
+        return [str(extracted_srcml()), *args]
+    except (OSError, subprocess.CalledProcessError):
+        # Sem cache utilizável: deixa o AppImage se extrair sozinho a cada execução
+        return [str(APPIMAGE), *args]
+
+
+def srcml_env() -> dict:
+    env = os.environ.copy()
+    env["APPIMAGE_EXTRACT_AND_RUN"] = "1"
+    return env
+
+
+def limit_concurrency(semaphore):
+    """Faz srcml_slot() passar por `semaphore` neste processo (None remove o limite)."""
+    global _slots
+    _slots = semaphore
+
+
+def srcml_slot():
+    """Contexto a manter enquanto um srcML roda, respeitando limit_concurrency()."""
+    return _slots if _slots is not None else contextlib.nullcontext()
+
+
+def srcml_version() -> str:
+    """Primeira linha de `srcml --version` (ex.: "srcml 1.0.0")."""
+    return _version_of(tuple(srcml_command("--version")))
+
+
+@functools.lru_cache(maxsize=None)
+def _version_of(command):
+    result = subprocess.run(command, env=srcml_env(), check=True, capture_output=True, text=True)
+    return result.stdout.splitlines()[0].strip()
@@ -0,0 +1,122 @@
+"""
+Cache local da saída do srcML, endereçado pelo conteúdo: a chave é o hash do
+código C + versão do srcML + flags. Guarda o XML comprimido (zlib), com
+despejo LRU (pelo mtime do arquivo) quando passa de `max_bytes`.
+"""
+import hashlib
+import os
+import tempfile
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from source.srcml import SRCML_FLAGS, cache_root, srcml_version
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+SUFFIX = ".xml.z"
+
+
+class SrcmlCache:
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, flags=SRCML_FLAGS, version=None):
+        self.directory = Path(directory) if directory else cache_root() / "xml"
+        self.max_bytes = max_bytes
+        self.flags = tuple(flags)
+        self._version = version
+        self._size = None  # bytes em disco, calculado na primeira escrita
+        self.stats = Counter()  # hits, misses, stores, evictions
+
+    @property
+    def version(self):
+        # Só roda `srcml --version` quando o cache é usado de fato
+        if self._version is None:
+            self._version = srcml_version()
+        return self._version
+
+    def key(self, source: bytes, extra_flags=()) -> str:
+        """`extra_flags`: flags da execução além das do cache (ex.: --archive), que mudam o XML."""
+        digest = hashlib.sha256()
+        digest.update(self.version.encode())
+        digest.update(b"\0" + " ".join(self.flags + tuple(extra_flags)).encode() + b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / (key + SUFFIX)
+
+    def get(self, source: bytes, extra_flags=()):
+        """XML do srcML para `source`, ou None se não está no cache."""
+        path = self._path(self.key(source, extra_flags))
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        try:
+            # mtime marca o último uso (LRU)
+            os.utime(path)
+        except OSError:
+            pass
+        return zlib.decompress(data)
+
+    def put(self, source: bytes, xml: bytes, extra_flags=()):
+        path = self._path(self.key(source, extra_flags))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(xml)
+
+        # Escreve num temporário e renomeia: leitores nunca veem um arquivo pela metade
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        try:
+            previous = path.stat().st_size
+        except FileNotFoundError:
+            previous = 0
+        os.replace(tmp, path)
+        self.stats["stores"] += 1
+
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += len(data) - previous
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def fetch(self, source: bytes, convert) -> bytes:
+        """XML de `source` do cache; na falta, chama convert(source) e guarda o resultado."""
+        xml = self.get(source)
+        if xml is None:
+            xml = convert(source)
+            self.put(source, xml)
+        return xml
+
+    def _entries(self):
+        for path in self.directory.glob("*/*" + SUFFIX):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime_ns, stat.st_size, path
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até caber em max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats["evictions"] += 1
+        self._size = total
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
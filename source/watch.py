@@ -0,0 +1,210 @@
+"""
+Modo watch: um processo que fica de pé com os tradutores carregados e
+retraduz só os .c/.h alterados.
+
+As mudanças chegam pelo inotify (via ctypes, só Linux) ou, na falta dele, por
+varredura periódica de mtimes. Salvamentos em rajada (editores que gravam em
+temporário e renomeiam, "salvar tudo"...) são agrupados: o lote só é processado
+depois de `debounce` segundos sem eventos novos. Cada arquivo é retraduzido com
+translate_incremental, então só as funções/declarações que mudaram passam de
+novo pelos tradutores.
+"""
+import ctypes
+import ctypes.util
+import errno
+import io
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from source.c2xml import C_SUFFIXES, collect_c_files, output_path
+from source.pipeline import srcml_xml
+from source.srcml import srcml_command
+from source.xml2clearly.incremental import IncrementalCache, translate_incremental
+
+DEFAULT_DEBOUNCE = 0.1
+POLL_INTERVAL = 0.25
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def is_c_file(path: Path) -> bool:
+    return path.suffix in C_SUFFIXES
+
+
+class PollingWatcher:
+    """Compara mtimes a cada `interval` segundos. Funciona em qualquer sistema."""
+
+    def __init__(self, root, interval=POLL_INTERVAL):
+        self.root = Path(root)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in collect_c_files([self.root]):
+            try:
+                snapshot[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return snapshot
+
+    def poll(self, timeout):
+        """Espera até `timeout` segundos e devolve os arquivos criados, alterados ou removidos."""
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {path for path, mtime in snapshot.items() if self.snapshot.get(path) != mtime}
+        changed |= self.snapshot.keys() - snapshot.keys()
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """inotify via ctypes, com um watch por diretório (novos diretórios entram sozinhos)."""
+
+    def __init__(self, root):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.dirs = {}  # wd -> diretório
+        self._add_tree(Path(root))
+
+    def _add_tree(self, root):
+        for directory, _, _ in os.walk(root):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOENT:
+                    continue
+                raise OSError(error, f"inotify_add_watch falhou em {directory}")
+            self.dirs[wd] = Path(directory)
+
+    def poll(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Diretório novo: vigia e trata os arquivos que já vieram dentro dele
+                    self._add_tree(path)
+                    changed.update(collect_c_files([path]))
+            elif is_c_file(path):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(root, polling=False):
+    """InotifyWatcher quando disponível; PollingWatcher caso contrário ou com polling=True."""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root)
+
+
+class Translator:
+    """Retraduz arquivos mantendo, por arquivo, o cache incremental em memória."""
+
+    def __init__(self, source_root, output_root):
+        self.source_root = Path(source_root)
+        self.output_root = Path(output_root)
+        self.caches = {}
+
+    def update(self, path: Path):
+        """Traduz `path` (ou remove a saída, se ele sumiu). Devolve "ok", "removed" ou a mensagem de erro."""
+        output = output_path(path, self.source_root, self.output_root)
+        if not path.exists():
+            self.caches.pop(path, None)
+            if output.exists():
+                output.unlink()
+            return "removed"
+
+        cache = self.caches.get(path)
+        if cache is None:
+            # Sem caminho: o cache incremental vive só enquanto o watch rodar
+            cache = self.caches[path] = IncrementalCache()
+        try:
+            xml = srcml_xml(path=path)
+            text = translate_incremental(io.BytesIO(xml), cache)
+        except Exception as exc:
+            return f"{type(exc).__name__}: {exc}"
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(text, encoding="utf-8")
+        return "ok"
+
+
+def watch(source_root, output_root, debounce=DEFAULT_DEBOUNCE, polling=False, initial=True,
+          report=print, should_stop=lambda: False):
+    """
+    Vigia `source_root` e mantém `output_root` em dia até should_stop() ser verdadeiro.
+    `report(path, status, segundos)` recebe cada arquivo processado, com o tempo
+    desde o primeiro evento do lote.
+    """
+    translator = Translator(source_root, output_root)
+    # Resolve o srcML (extração do AppImage) antes do primeiro salvamento
+    srcml_command()
+
+    # Vigia antes da passada inicial: o que mudar durante ela também entra
+    watcher = make_watcher(source_root, polling)
+    if initial:
+        for path in collect_c_files([source_root]):
+            start = time.perf_counter()
+            report(path, translator.update(path), time.perf_counter() - start)
+
+    pending = set()
+    first_event = None
+    try:
+        while not should_stop():
+            changed = watcher.poll(debounce if pending else 1.0)
+            if changed:
+                pending |= changed
+                first_event = first_event or time.perf_counter()
+                continue
+            if not pending:
+                continue
+
+            for path in sorted(pending):
+                report(path, translator.update(path), time.perf_counter() - first_event)
+            pending.clear()
+            first_event = None
+    finally:
+        watcher.close()
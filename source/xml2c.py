@@ -1,10 +1,10 @@
 import subprocess
-import os
 from pathlib import Path
 
+from source.srcml import srcml_command, srcml_env
+
 def xml2c(xml_filename: str):
     root = Path(__file__).parent.parent
-    appimage = root / "srcml" / "srcml-x86_64.AppImage"
     arquivo_xml = root / xml_filename
 
     if not arquivo_xml.exists():
@@ -15,17 +15,15 @@ def xml2c(xml_filename: str):
     else:
         raise ValueError("O nome do arquivo XML deve terminar com .xml")
 
-    env = os.environ.copy()
-    env["APPIMAGE_EXTRACT_AND_RUN"] = "1"
-
     # Sem a flag --from=srcML
     subprocess.run(
-        [str(appimage), str(arquivo_xml), "-o", str(arquivo_c)],
-        env=env,
+        srcml_command(str(arquivo_xml), "-o", str(arquivo_c)),
+        env=srcml_env(),
         check=True
     )
 
     print(f"✅ {arquivo_c.name} gerado com sucesso em: {arquivo_c}")
 
-# Exemplo de uso
-xml2c("variables.xml")
+if __name__ == "__main__":
+    # Exemplo de uso
+    xml2c("variables.xml")
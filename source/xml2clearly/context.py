@@ -0,0 +1,21 @@
+class TranslationContext:
+    """
+    Estado de uma tradução, passado a todo tradutor como segundo argumento:
+    o translate a usar nos filhos, caches compartilhados e opções.
+    """
+
+    def __init__(self, engine, **options):
+        self._engine = engine
+        self.options = options
+        self.caches = {}
+
+    def translate(self, tag) -> str:
+        """Traduz `tag` neste mesmo contexto (caches e opções compartilhados)."""
+        return self._engine(tag, self)
+
+    def cache(self, name) -> dict:
+        """Cache nomeado, vivo enquanto durar o contexto."""
+        cache = self.caches.get(name)
+        if cache is None:
+            cache = self.caches[name] = {}
+        return cache
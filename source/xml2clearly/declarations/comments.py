@@ -2,7 +2,7 @@ from source.xml2clearly.registry import register
 
 
 @register("comment", priority=10)
-def translate_comment(tag):
+def translate_comment(tag, ctx):
     indent = "    " * tag.indent_level
     text = tag.text  # pode conter múltiplas linhas, e já inclui os delimitadores // ou /* */
 
@@ -1,79 +1,24 @@
-from source.xml2clearly.registry import register
+from source.xml2clearly.emitter import Emitter
+from source.xml2clearly.registry import register, register_emitter
 from source.xml2clearly.xml_manager import Tag
+from source.xml2clearly.context import TranslationContext
 from source.xml2clearly.pointers.resolve import resolve_pointer_notation
+from source.xml2clearly.symbols import lookup_call_type
+from source.xml2clearly.type_analysis import analyze_type
 
 
 def extract_storage_specifiers(type_tag: Tag) -> list:
     """Extrai especificadores de armazenamento como static, extern, etc."""
     if not type_tag:
         return []
-
-    storage_specifiers = {"static", "extern", "register", "auto", "typedef"}
-    found_specifiers = []
-
-    # Verifica texto direto
-    if type_tag.text and type_tag.text.strip() in storage_specifiers:
-        found_specifiers.append(type_tag.text.strip())
-
-    # Verifica filhos
-    for child in type_tag.children:
-        if child.name == "specifier" and child.text:
-            text = child.text.strip()
-            if text in storage_specifiers:
-                found_specifiers.append(text)
-
-    return found_specifiers
+    return list(analyze_type(type_tag).storage)
 
 
 def extract_type_text(type_tag: Tag) -> str:
     """Extrai apenas o tipo, ignorando especificadores de armazenamento como static, extern"""
     if not type_tag:
         return "void"
-
-    # Lista de especificadores de armazenamento para ignorar
-    storage_specifiers = {"static", "extern", "register", "auto", "typedef"}
-
-    # Coleta apenas os elementos que são realmente parte do tipo
-    type_parts = []
-
-    # Primeiro adiciona o texto direto se não for especificador
-    if type_tag.text and type_tag.text.strip():
-        text = type_tag.text.strip()
-        if text not in storage_specifiers:
-            type_parts.append(text)
-
-    # Processa os filhos, separando especificadores do tipo real
-    for child in type_tag.children:
-        if child.name == "name" and child.text:
-            text = child.text.strip()
-            if text not in storage_specifiers:
-                type_parts.append(text)
-        elif child.name == "modifier" and child.text:
-            # Modificadores como * são parte do tipo
-            type_parts.append(child.text.strip())
-        elif child.name == "specifier" and child.text:
-            # Ignora especificadores de armazenamento
-            text = child.text.strip()
-            if text not in storage_specifiers:
-                type_parts.append(text)
-
-    # Se não encontrou nada, tenta uma busca mais ampla
-    if not type_parts:
-        def get_type_text(tag):
-            texts = []
-            if tag.text and tag.text.strip():
-                text = tag.text.strip()
-                if text not in storage_specifiers:
-                    texts.append(text)
-            for child in tag.children:
-                if child.name != "specifier" or (child.text and child.text.strip() not in storage_specifiers):
-                    texts.extend(get_type_text(child))
-            return texts
-
-        type_parts = get_type_text(type_tag)
-
-    result = " ".join(type_parts).strip()
-    return result if result else "void"
+    return analyze_type(type_tag).text
 
 
 def extract_parameter_info(param_tag: Tag) -> tuple:
@@ -107,7 +52,7 @@ def extract_parameter_info(param_tag: Tag) -> tuple:
 
 
 @register("function_decl", priority=10)
-def translate_function_decl(tag: Tag) -> str:
+def translate_function_decl(tag: Tag, ctx: TranslationContext) -> str:
     name_tag = tag.find("name")
     name = name_tag.text.strip() if name_tag and name_tag.text else "anon"
 
@@ -135,10 +80,8 @@ def translate_function_decl(tag: Tag) -> str:
     return f"{name}: {storage_prefix}fn({params_str}) -> {return_type}"
 
 
-@register("function", priority=10)
-def translate_function_def(tag: Tag) -> str:
-    from source.xml2clearly.translate import translate
-
+def function_header(tag: Tag) -> str:
+    """Linha "def nome(parâmetros) -> retorno:" de uma <function>."""
     name_tag = tag.find("name")
     name = name_tag.text.strip() if name_tag and name_tag.text else "anon"
 
@@ -163,72 +106,84 @@ def translate_function_def(tag: Tag) -> str:
     if storage_specs:
         storage_prefix = " ".join(storage_specs) + " "
 
-    header = f"def {storage_prefix}{name}({params_str}) -> {return_type}:"
+    return f"def {storage_prefix}{name}({params_str}) -> {return_type}:"
+
 
+def function_statements(tag: Tag) -> list:
+    """Filhos do <block_content> do corpo, na ordem."""
     block = tag.find("block")
-    if block:
-        body_parts = []
-        for child in block.children:
-            if child.name == "block_content":
-                for inner_child in child.children:
-                    translated = translate(inner_child)
-                    if translated and translated.strip():
-                        body_parts.append(translated.strip())
-        body = "\n    ".join(body_parts) if body_parts else "pass"
-    else:
-        body = "pass"
+    if not block:
+        return []
+    return [inner for child in block.children if child.name == "block_content" for inner in child.children]
+
+
+@register("function", priority=10)
+def translate_function_def(tag: Tag, ctx: TranslationContext) -> str:
+    header = function_header(tag)
+
+    body_parts = []
+    for inner_child in function_statements(tag):
+        translated = yield inner_child
+        if translated and translated.strip():
+            body_parts.append(translated.strip())
+    body = "\n    ".join(body_parts) if body_parts else "pass"
 
     return f"{header}\n    {body}"
 
 
+@register_emitter("function", replaces=translate_function_def)
+def emit_function_def(tag: Tag, out: Emitter, ctx: TranslationContext):
+    """translate_function_def escrevendo o corpo comando a comando, sem juntar tudo numa str."""
+    out.write(function_header(tag))
+    empty = True
+    with out.indented():
+        for inner_child in function_statements(tag):
+            translated = ctx.translate(inner_child)
+            if translated and translated.strip():
+                out.line(translated.strip())
+                empty = False
+        if empty:
+            out.line("pass")
+
+
 @register("return", priority=10)
-def translate_return(tag: Tag) -> str:
+def translate_return(tag: Tag, ctx: TranslationContext) -> str:
     """Traduz statement return"""
-    from source.xml2clearly.translate import translate
-
     expr_tag = tag.find("expr")
     if expr_tag:
-        expr_translated = translate(expr_tag)
+        expr_translated = yield expr_tag
         return f"return {expr_translated}"
     else:
         return "return"
 
 
 @register("name", priority=5)
-def translate_name(tag: Tag) -> str:
+def translate_name(tag: Tag, ctx: TranslationContext) -> str:
     """Traduz tags <name> simples"""
     return tag.text.strip() if tag.text else ""
 
 
 @register("operator", priority=5)
-def translate_operator(tag: Tag) -> str:
+def translate_operator(tag: Tag, ctx: TranslationContext) -> str:
     """Traduz operadores"""
     return tag.text.strip() if tag.text else ""
 
 
-def lookup_call_type(name: str) -> str:
-    # Por enquanto tudo fn
-    # No futuro: verifica macro_table, pointer_table etc
-    return "fn"
-
-
 @register("call", priority=10)
-def translate_call(tag: Tag) -> str:
-    from source.xml2clearly.translate import translate
-
+def translate_call(tag: Tag, ctx: TranslationContext) -> str:
     # Nome da função/chamada
     name_tag = tag.find("name")
-    name = translate(name_tag) if name_tag else "anon"
+    name = (yield name_tag) if name_tag else "anon"
 
     # Argumentos
     arg_list = tag.find("argument_list")
     args = []
     if arg_list:
         for arg in arg_list.find_children("argument"):
-            args.append(translate(arg))
+            args.append((yield arg))
 
     args_str = ", ".join(args)
 
-    # Por enquanto tudo é call fn
-    call_type = lookup_call_type(name)
+    # macro, ponteiro de função ou função, pela tabela de símbolos do arquivo
+    call_type = lookup_call_type(name, tag, ctx)
     return f"call {call_type} {name}({args_str})"
\ No newline at end of file
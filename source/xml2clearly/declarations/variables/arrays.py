@@ -1,6 +1,9 @@
-from source.xml2clearly.xml_manager import Tag
-from source.xml2clearly.registry import register
-from source.xml2clearly.declarations.variables.helpers import translate_type
+from source.xml2clearly.xml_manager import Tag, kind_bit
+from source.xml2clearly.registry import DISPATCH, register
+from source.xml2clearly.context import TranslationContext
+from source.xml2clearly.declarations.variables import base
+from source.xml2clearly.declarations.variables.helpers import find_previous_decl_type, translate_type
+from source.xml2clearly.query import query
 
 
 # =============================================================================
@@ -28,59 +31,111 @@ def safe_get_text(tag: Tag, default: str = "") -> str:
 
 def find_tag_by_name(tag: Tag, name: str) -> Tag | None:
     """Encontra primeira tag filha com nome específico."""
-    return next((child for child in tag.children
-                 if hasattr(child, 'name') and child.name == name), None)
+    return query(name).first(tag)
+
+
+INDEX_BELOW = query("//index")
+
+
+def find_index(tag: Tag) -> Tag | None:
+    """Primeiro <index> da subárvore (o próprio nó incluído), em pré-ordem."""
+    if not tag.has_kind("index"):
+        return None
+    return tag if tag.name == "index" else INDEX_BELOW.first(tag)
 
 
 def has_any_index(tag: Tag) -> bool:
-    """Verifica se tem algum índice em qualquer lugar."""
-    if hasattr(tag, 'name') and tag.name == "index":
-        return True
-    if hasattr(tag, 'children'):
-        return any(has_any_index(child) for child in tag.children)
-    return False
+    """Verifica se tem algum índice em qualquer lugar (O(1), pelo resumo da subárvore)."""
+    return tag.has_kind("index")
+
+
+def is_array_tag(tag: Tag) -> bool:
+    """Verifica se é declaração de array (versão mais robusta)."""
+    try:
+        name_tags = tag.find_children("name")
+        return any(has_index_children(name) for name in name_tags)
+    except Exception:
+        return False
+
+
+def has_index_children(tag: Tag) -> bool:
+    """Verifica se tem filhos index."""
+    try:
+        return query("index").exists(tag)
+    except Exception:
+        return False
+
+
+def is_indexed_array_block(tag: Tag) -> bool:
+    """Detecta blocos indexados de forma mais simples."""
+    try:
+        for expr in tag.find_children("expr"):
+            if has_any_index(expr):
+                return True
+        return False
+    except Exception:
+        return False
+
+
+def is_array_initialization_block(tag: Tag) -> bool:
+    """
+    Detecta blocos de inicialização (versão mais precisa).
+    """
+    try:
+        while True:
+            if not tag.parent:
+                return False
+
+            parent = tag.parent
+            grandparent = parent.parent if parent else None
+
+            # Caso direto: parent=expr, grandparent=init
+            if (hasattr(parent, 'name') and parent.name == "expr" and
+                    hasattr(grandparent, 'name') and grandparent and grandparent.name == "init"):
+                return True
+
+            # Caso aninhado: dentro de outro bloco de array (arrays multidimensionais)
+            if (hasattr(parent, 'name') and parent.name == "expr" and
+                    hasattr(grandparent, 'name') and grandparent and grandparent.name == "block"):
+                tag = grandparent
+                continue
+
+            return False
+    except Exception:
+        return False
 
 
 # =============================================================================
 # MELHORIAS NO CÓDIGO ORIGINAL
 # =============================================================================
 
-@register("decl", priority=20)
-def translate_decl_array(tag: Tag) -> str:
+@register("decl", priority=20, applies=is_array_tag)
+def translate_decl_array(tag: Tag, ctx: TranslationContext) -> str:
     """
     Traduz declarações de arrays com melhor tratamento de erros.
+    Declarações que não são array nem chegam aqui (applies=is_array_tag).
     """
-    from source.xml2clearly.translate import translate
-
     try:
-        if not is_array_tag(tag):
-            return translate_base_decl(tag)
-
         # Extrair informações básicas
         var_name = extract_variable_name(tag)
-        base_type = extract_base_type(tag)
-        array_type = build_array_type(tag, base_type, translate)
+        base_type = extract_base_type(tag, ctx)
+        array_type = build_array_type(tag, base_type, ctx.translate)
 
         # Verificar se há inicialização
         init_tags = tag.find_children("init")
         if init_tags:
-            init_str = translate_array_init(init_tags[0], translate)
+            init_str = translate_array_init(init_tags[0], ctx.translate)
             return f"{var_name}: {array_type} = {init_str}"
         else:
             return f"{var_name}: {array_type}"
 
     except Exception:
         # Em caso de erro, tenta tradução base
-        return translate_base_decl(tag)
-
+        return translate_base_decl(tag, ctx)
 
-@register("block", priority=60)
-def translate_indexed_array_block(tag: Tag) -> str | None:
-    from source.xml2clearly.translate import translate
-
-    if not is_indexed_array_block(tag):
-        return None
 
+@register("block", priority=60, applies=is_indexed_array_block)
+def translate_indexed_array_block(tag: Tag, ctx: TranslationContext) -> str | None:
     try:
         var_name = infer_variable_name(tag) or "?"
         items = []
@@ -89,17 +144,17 @@ def translate_indexed_array_block(tag: Tag) -> str | None:
 
         for expr in tag.find_children("expr"):
             if has_any_index(expr):
-                index_tag = next((n for n in expr.walk() if getattr(n, 'name', None) == "index"), None)
+                index_tag = find_index(expr)
                 index_expr = find_tag_by_name(index_tag, "expr") if index_tag else None
                 if index_expr:
-                    index_str = translate(index_expr).strip()
+                    index_str = ctx.translate(index_expr).strip()
                     value_str = None
                     found_eq = False
                     for child in expr.children:
                         if getattr(child, 'name', None) == "operator" and getattr(child, 'text', '') == "=":
                             found_eq = True
                         elif found_eq and getattr(child, 'name', None) == "literal":
-                            value_str = translate(child).strip()
+                            value_str = ctx.translate(child).strip()
                             break
 
                     if value_str:
@@ -110,7 +165,7 @@ def translate_indexed_array_block(tag: Tag) -> str | None:
             if not has_any_index(expr):
                 for child in expr.children:
                     if getattr(child, 'name', None) == "literal":
-                        value_str = translate(child).strip()
+                        value_str = ctx.translate(child).strip()
                         while str(sequential_index) in used_index_keys:
                             sequential_index += 1
                         items.append(f"{var_name}[{sequential_index}] = {value_str}")
@@ -118,13 +173,7 @@ def translate_indexed_array_block(tag: Tag) -> str | None:
                         sequential_index += 1
                         break
 
-        # pegar linhas de start e end da tag
-        start_str = tag.attrib.get("{http://www.srcML.org/srcML/position}start")
-        end_str = tag.attrib.get("{http://www.srcML.org/srcML/position}end")
-        start_line = int(start_str.split(":")[0]) if start_str else 0
-        end_line = int(end_str.split(":")[0]) if end_str else 0
-
-        if end_line > start_line:
+        if tag.spans_lines():
             # múltiplas linhas, formatar com quebras e indentação
             joined = ",\n    ".join(items)
             return "(\n    " + joined + "\n)"
@@ -140,7 +189,7 @@ def translate_indexed_array_block(tag: Tag) -> str | None:
 
 def extract_index_int(expr: Tag, translate_fn) -> int | None:
     """Extrai valor inteiro do índice, se possível."""
-    index_tag = next((n for n in expr.walk() if getattr(n, 'name', None) == "index"), None)
+    index_tag = find_index(expr)
     index_expr = find_tag_by_name(index_tag, "expr") if index_tag else None
     if index_expr:
         try:
@@ -149,18 +198,13 @@ def extract_index_int(expr: Tag, translate_fn) -> int | None:
             return None
     return None
 
-@register("block", priority=50)
-def translate_array_block(tag: Tag) -> str | None:
+@register("block", priority=50, applies=is_array_initialization_block)
+def translate_array_block(tag: Tag, ctx: TranslationContext) -> str | None:
     """
     Traduz blocos sequenciais com melhor recursão.
     """
-    from source.xml2clearly.translate import translate
-
-    if not is_array_initialization_block(tag):
-        return None
-
     try:
-        return translate_block_recursive(tag, translate)
+        return translate_block_recursive(tag, ctx.translate)
     except Exception:
         return None
 
@@ -175,11 +219,7 @@ def parse_indexed_expression(expr: Tag, var_name: str, translate_fn) -> str | No
     """
     try:
         # Verifica se tem index (elemento indexado)
-        index_tag = None
-        for node in expr.walk():
-            if hasattr(node, 'name') and node.name == "index":
-                index_tag = node
-                break
+        index_tag = find_index(expr)
 
         if index_tag:
             # Elemento indexado: [i] = valor
@@ -214,19 +254,84 @@ def parse_indexed_expression(expr: Tag, var_name: str, translate_fn) -> str | No
     return None
 
 
-def translate_block_recursive(block_tag: Tag, translate_fn) -> str:
+# Subárvore de um bloco plano: só block, expr e literal
+FLAT_KINDS = kind_bit("block") | kind_bit("expr") | kind_bit("literal")
+
+
+def flat_literals(block_tag: Tag) -> list | None:
     """
-    Traduz bloco recursivamente de forma mais limpa.
+    Textos dos literais de um bloco plano ({0x12, 0x34, ...}: cada filho é um
+    <expr> com um único <literal>), numa passada; None se o bloco não é assim.
+    Só vale com os tradutores de expr/literal deste pacote, que devolveriam
+    exatamente esses textos (com profiling ou substitutos, vai pelo caminho normal).
     """
-    elements = []
+    if block_tag.kinds & ~FLAT_KINDS:
+        return None
+    if (DISPATCH["expr"][0][0] is not base.translate_expr
+            or DISPATCH["literal"][0][0] is not base.translate_literal):
+        return None
 
+    texts = []
     for child in block_tag.children:
-        if hasattr(child, 'name') and child.name == "expr":
-            element = translate_expression_content(child, translate_fn)
-            if element:
-                elements.append(element)
+        inner = child.children
+        if child.name != "expr" or len(inner) != 1 or inner[0].name != "literal" or not inner[0].text:
+            return None
+        texts.append(inner[0].text)
+    return texts
+
 
-    return "[" + ", ".join(elements) + "]"
+def stock_block_translators() -> bool:
+    """Um <block> ainda é traduzido por translate_indexed_array_block/translate_array_block."""
+    return tuple(entry[0] for entry in DISPATCH["block"][:2]) == (translate_indexed_array_block, translate_array_block)
+
+
+def format_flat_literals(block_tag: Tag, texts: list) -> str:
+    """format_init_str de um bloco plano, montado direto dos textos (sem juntar e separar de novo)."""
+    raw = "[" + ", ".join(texts) + "]"
+    if not block_tag.spans_lines():
+        return raw
+    # Vírgula dentro de um literal ("a,b") ou colchete nas pontas: format_init_str quebraria
+    # diferente; esses casos raros vão por ele
+    if not texts or raw.count(",") != len(texts) - 1 or raw[1] in "()[]{}" or raw[-2] in "()[]{}":
+        return format_init_str(block_tag, raw)
+    return "(\n    " + ",\n    ".join(texts) + "\n)"
+
+
+def translate_block_recursive(block_tag: Tag, translate_fn) -> str:
+    """
+    Traduz bloco (e blocos aninhados) em lista, com pilha explícita em vez de recursão.
+    """
+    texts = flat_literals(block_tag)
+    if texts is not None:
+        return "[" + ", ".join(texts) + "]"
+
+    # Cada quadro: (iterador dos filhos ainda não vistos, elementos já traduzidos)
+    stack = [(iter(block_tag.children), [])]
+
+    while True:
+        children, elements = stack[-1]
+        for child in children:
+            if hasattr(child, 'name') and child.name == "expr":
+                # Procura primeiro por blocos aninhados
+                nested = find_tag_by_name(child, "block")
+                if nested:
+                    texts = flat_literals(nested)
+                    if texts is not None:
+                        elements.append("[" + ", ".join(texts) + "]")
+                        continue
+                    stack.append((iter(nested.children), []))
+                    break
+
+                # Senão, traduz a expressão diretamente
+                element = translate_fn(child).strip()
+                if element:
+                    elements.append(element)
+        else:
+            translated = "[" + ", ".join(elements) + "]"
+            stack.pop()
+            if not stack:
+                return translated
+            stack[-1][1].append(translated)
 
 
 def translate_expression_content(expr_tag: Tag, translate_fn) -> str | None:
@@ -242,61 +347,6 @@ def translate_expression_content(expr_tag: Tag, translate_fn) -> str | None:
     return translate_fn(expr_tag).strip()
 
 
-def is_array_tag(tag: Tag) -> bool:
-    """Verifica se é declaração de array (versão mais robusta)."""
-    try:
-        name_tags = tag.find_children("name")
-        return any(has_index_children(name) for name in name_tags)
-    except Exception:
-        return False
-
-
-def has_index_children(tag: Tag) -> bool:
-    """Verifica se tem filhos index."""
-    try:
-        return any(hasattr(child, 'name') and child.name == "index"
-                   for child in tag.children)
-    except Exception:
-        return False
-
-
-def is_indexed_array_block(tag: Tag) -> bool:
-    """Detecta blocos indexados de forma mais simples."""
-    try:
-        for expr in tag.find_children("expr"):
-            if has_any_index(expr):
-                return True
-        return False
-    except Exception:
-        return False
-
-
-def is_array_initialization_block(tag: Tag) -> bool:
-    """
-    Detecta blocos de inicialização (versão mais precisa).
-    """
-    try:
-        if not tag.parent:
-            return False
-
-        parent = tag.parent
-        grandparent = parent.parent if parent else None
-
-        # Caso direto: parent=expr, grandparent=init
-        if (hasattr(parent, 'name') and parent.name == "expr" and
-                hasattr(grandparent, 'name') and grandparent and grandparent.name == "init"):
-            return True
-
-        # Caso aninhado: dentro de outro bloco de array (arrays multidimensionais)
-        if (hasattr(parent, 'name') and parent.name == "expr" and
-                hasattr(grandparent, 'name') and grandparent and grandparent.name == "block"):
-            return is_array_initialization_block(grandparent)
-
-        return False
-    except Exception:
-        return False
-
-
 def extract_variable_name(tag: Tag) -> str:
     """Extrai nome com fallbacks."""
     try:
@@ -316,7 +366,7 @@ def extract_variable_name(tag: Tag) -> str:
         return config.UNNAMED_VAR
 
 
-def extract_base_type(tag: Tag) -> str:
+def extract_base_type(tag: Tag, ctx: TranslationContext) -> str:
     """Extrai tipo base com cache simples."""
     try:
         type_tags = tag.find_children("type")
@@ -327,7 +377,7 @@ def extract_base_type(tag: Tag) -> str:
 
         # Se referencia tipo anterior
         if type_tag.attrib.get("ref") == "prev":
-            return find_previous_type(tag)
+            return find_previous_decl_type(tag, ctx)
 
         return translate_type(type_tag)
 
@@ -335,30 +385,6 @@ def extract_base_type(tag: Tag) -> str:
         return config.UNKNOWN_TYPE
 
 
-def find_previous_type(tag: Tag) -> str:
-    """Encontra tipo anterior (versão mais simples)."""
-    try:
-        parent = tag.parent
-        if not parent:
-            return config.UNKNOWN_TYPE
-
-        decls = parent.find_children("decl")
-        current_idx = decls.index(tag) if tag in decls else -1
-
-        # Procura declaração anterior com tipo explícito
-        for i in range(current_idx - 1, -1, -1):
-            prev_decl = decls[i]
-            type_tags = prev_decl.find_children("type")
-
-            if type_tags and type_tags[0].attrib.get("ref") != "prev":
-                return translate_type(type_tags[0])
-
-        return config.UNKNOWN_TYPE
-
-    except Exception:
-        return config.UNKNOWN_TYPE
-
-
 def infer_variable_name(tag: Tag) -> str | None:
     """Infere nome da variável (versão simplificada)."""
     try:
@@ -412,12 +438,7 @@ def extract_array_dimension(index_tag: Tag, translate_fn) -> str:
 
 
 def format_init_str(tag: Tag, init_str: str) -> str:
-    start_str = tag.attrib.get("{http://www.srcML.org/srcML/position}start")
-    end_str = tag.attrib.get("{http://www.srcML.org/srcML/position}end")
-    start_line = int(start_str.split(":")[0]) if start_str else 0
-    end_line = int(end_str.split(":")[0]) if end_str else 0
-
-    if end_line > start_line:
+    if tag.spans_lines():
         # Adiciona quebras e indentação
         # Aqui pode ser necessário fazer split no init_str para adicionar quebras:
         parts = [p.strip() for p in init_str.strip("()[]{}").split(",")]
@@ -435,6 +456,10 @@ def translate_array_init(init_tag: Tag, translate_fn) -> str:
         expr = expr_tags[0]
         block_tags = expr.find_children("block")
         if block_tags:
+            # Tabelas enormes de literais (blobs, lookup tables): sem despachar elemento a elemento
+            texts = flat_literals(block_tags[0]) if stock_block_translators() else None
+            if texts is not None:
+                return format_flat_literals(block_tags[0], texts)
             raw = translate_fn(block_tags[0]).strip()
             return format_init_str(block_tags[0], raw)
 
@@ -445,10 +470,11 @@ def translate_array_init(init_tag: Tag, translate_fn) -> str:
         return "[]"
 
 
-def translate_base_decl(tag: Tag) -> str:
+# Logo abaixo de translate_decl_array: declarações não-array caem direto aqui
+@register("decl", priority=19)
+def translate_base_decl(tag: Tag, ctx: TranslationContext) -> str:
     """Fallback para declarações não-array."""
     try:
-        from source.xml2clearly.declarations.variables import base
-        return base.translate_decl(tag)
+        return base.translate_decl(tag, ctx)
     except Exception:
         return "TRANSLATION_ERROR"
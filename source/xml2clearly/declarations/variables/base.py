@@ -1,5 +1,6 @@
 from source.xml2clearly.xml_manager import Tag
 from source.xml2clearly.registry import register
+from source.xml2clearly.context import TranslationContext
 from source.xml2clearly.declarations.variables.helpers import (
     translate_type,
     find_previous_decl_type,
@@ -9,18 +10,18 @@ from source.xml2clearly.declarations.variables.helpers import (
 
 
 @register("decl_stmt", priority=10)
-def translate_decl_stmt(tag: Tag) -> str:
-    from source.xml2clearly.translate import translate  # import tardio para quebrar ciclo
-
+def translate_decl_stmt(tag: Tag, ctx: TranslationContext) -> str:
     decls = tag.find_children("decl")
-    parts = [translate(decl) for decl in decls if translate(decl).strip()]
+    parts = []
+    for decl in decls:
+        translated = yield decl
+        if translated.strip():
+            parts.append(translated)
     return ", ".join(parts)
 
 
 @register("decl", priority=10)
-def translate_decl(tag: Tag) -> str:
-    from source.xml2clearly.translate import translate  # import tardio pra evitar circular import
-
+def translate_decl(tag: Tag, ctx: TranslationContext) -> str:
     var_name_tag = tag.find_children("name")
     var_name = var_name_tag[0].text if var_name_tag else "UNNAMED"
 
@@ -28,26 +29,24 @@ def translate_decl(tag: Tag) -> str:
     if type_tag and not type_tag[0].attrib.get("ref") == "prev":
         type_str = translate_type(type_tag[0])
     else:
-        type_str = find_previous_decl_type(tag)
+        type_str = find_previous_decl_type(tag, ctx)
 
     init_tag = tag.find_children("init")
     if init_tag:
-        init_str = translate_init(init_tag[0], translate)  # <<-- passa a função translate aqui!
+        init_str = translate_init(init_tag[0], ctx.translate)
         return f"{var_name}: {type_str} = {init_str}"
     else:
         return f"{var_name}: {type_str}"
 
 
 @register("expr", priority=10)
-def translate_expr(tag: Tag) -> str:
+def translate_expr(tag: Tag, ctx: TranslationContext) -> str:
     """Traduz expressões de forma mais inteligente"""
-    from source.xml2clearly.translate import translate
-
     # Se a expressão tem filhos, processa cada um
     if tag.children:
         parts = []
         for child in tag.children:
-            translated = translate(child)
+            translated = yield child
             if translated and translated.strip():
                 parts.append(translated.strip())
 
@@ -60,12 +59,12 @@ def translate_expr(tag: Tag) -> str:
 
 
 @register("literal", priority=10)
-def translate_literal(tag: Tag) -> str:
+def translate_literal(tag: Tag, ctx: TranslationContext) -> str:
     return tag.text.strip() if tag.text else ""
 
 
 @register("comment", priority=10)
-def translate_comment(tag: Tag) -> str:
+def translate_comment(tag: Tag, ctx: TranslationContext) -> str:
     """Traduz comentários preservando o formato original"""
     comment_type = tag.attrib.get("type", "")
 
@@ -89,13 +88,11 @@ def translate_comment(tag: Tag) -> str:
 
 
 @register("block_content", priority=10)
-def translate_block_content(tag: Tag) -> str:
+def translate_block_content(tag: Tag, ctx: TranslationContext) -> str:
     """Traduz conteúdo de blocos"""
-    from source.xml2clearly.translate import translate
-
     parts = []
     for child in tag.children:
-        translated = translate(child)
+        translated = yield child
         if translated and translated.strip():
             parts.append(translated.strip())
 
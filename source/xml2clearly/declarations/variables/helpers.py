@@ -1,38 +1,31 @@
 from source.xml2clearly.xml_manager import Tag
+from source.xml2clearly.context import TranslationContext
+from source.xml2clearly.type_analysis import analyze_type
 
-def find_previous_decl_type(tag: Tag) -> str:
-    parent = tag.parent
-    if not parent:
+def find_previous_decl_type(tag: Tag, ctx: TranslationContext) -> str:
+    """
+    Tipo de um declarador com type ref="prev" (int a, b): o do último
+    declarador anterior com tipo explícito no mesmo statement. O statement é
+    resolvido de uma vez e fica no cache do contexto (só o último: os
+    declaradores de um statement são traduzidos em sequência).
+    """
+    statement = tag.parent
+    if not statement:
         return "UNKNOWN_TYPE"
-    decls = parent.find_children("decl")
-    try:
-        index = decls.index(tag)
-    except ValueError:
-        return "UNKNOWN_TYPE"
-    for i in range(index - 1, -1, -1):
-        t = decls[i].find_children("type")
-        if t and not t[0].attrib.get("ref") == "prev":
-            return translate_type(t[0])
-    return "UNKNOWN_TYPE"
+    cache = ctx.cache("previous_types")
+    if cache.get("statement") is not statement:
+        types = {}
+        current = "UNKNOWN_TYPE"
+        for decl in statement.find_children("decl"):
+            types[decl] = current
+            t = decl.find_children("type")
+            if t and not t[0].attrib.get("ref") == "prev":
+                current = translate_type(t[0])
+        cache["statement"], cache["types"] = statement, types
+    return cache["types"].get(tag, "UNKNOWN_TYPE")
 
 def translate_type(type_tag: Tag) -> str:
-    parts = []
-
-    def extract_type_parts(tag: Tag):
-        if tag.name in ("specifier", "name", "modifier"):
-            if tag.children:
-                for child in tag.children:
-                    extract_type_parts(child)
-            if tag.text:
-                parts.append(tag.text)
-        else:
-            if tag.text:
-                parts.append(tag.text)
-            for child in tag.children:
-                extract_type_parts(child)
-
-    extract_type_parts(type_tag)
-    return " ".join(parts).strip() or "UNKNOWN_TYPE"
+    return " ".join(analyze_type(type_tag).words).strip() or "UNKNOWN_TYPE"
 
 def translate_init(init_tag: Tag, translate_fn) -> str:
     expr_tag = init_tag.find_children("expr")
@@ -42,9 +35,5 @@ def translate_init(init_tag: Tag, translate_fn) -> str:
 
 
 def extract_text_recursive(tag: Tag) -> str:
-    texts = [tag.text] if tag.text else []
-    for child in tag.children:
-        child_text = extract_text_recursive(child)
-        if child_text:
-            texts.append(child_text)
-    return "".join(texts)
+    # O texto concatenado em pré-ordem é o mesmo da versão recursiva
+    return "".join(node.text for node in tag.walk() if node.text)
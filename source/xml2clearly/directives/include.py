@@ -1,13 +1,16 @@
 from source.xml2clearly.registry import register
 from source.xml2clearly.xml_manager import Tag
+from source.xml2clearly.context import TranslationContext
 
 
-@register("include", priority=10)
-def translate_include(tag: Tag) -> str:
-    file_tag = tag.find_children("file")
-    if not file_tag:
-        return None  # fallback para tradutores de menor prioridade
+def has_file(tag: Tag) -> bool:
+    return tag.find("file") is not None
+
 
+# Sem <file> cai direto para tradutores de menor prioridade
+@register("include", priority=10, applies=has_file)
+def translate_include(tag: Tag, ctx: TranslationContext) -> str:
+    file_tag = tag.find_children("file")
     filename = file_tag[0].text.strip()
 
     if filename.startswith("<") and filename.endswith(">"):
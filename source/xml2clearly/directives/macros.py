@@ -1,13 +1,15 @@
 from source.xml2clearly.registry import register
 from source.xml2clearly.xml_manager import Tag
+from source.xml2clearly.context import TranslationContext
 
 
-@register("define", priority=10)
-def translate_macro_flag(tag: Tag) -> str:
-    macro_tag = tag.find_children("macro")
-    if not macro_tag:
-        return None
+def has_macro(tag: Tag) -> bool:
+    return tag.find("macro") is not None
+
 
+@register("define", priority=10, applies=has_macro)
+def translate_macro_flag(tag: Tag, ctx: TranslationContext) -> str:
+    macro_tag = tag.find_children("macro")
     name_tag = macro_tag[0].find_children("name")
     value_tag = macro_tag[0].find_children("value")
 
@@ -0,0 +1,52 @@
+"""
+Saída em streaming: os tradutores de emissão escrevem fragmentos num Emitter
+em vez de devolver uma str que o pai vai concatenar de novo. Com `out`
+(arquivo aberto, sys.stdout, socket.makefile("w")...), o Emitter despeja o que
+acumulou a cada `buffer_size` caracteres; sem `out`, guarda tudo para
+getvalue(). Uma saída de centenas de MB não precisa existir inteira na memória.
+"""
+import contextlib
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class Emitter:
+    def __init__(self, out=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.out = out
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+        self._indent = ""
+
+    def write(self, text: str):
+        if not text:
+            return
+        self._parts.append(text)
+        self._size += len(text)
+        if self.out is not None and self._size >= self.buffer_size:
+            self.flush()
+
+    def line(self, text: str):
+        """Quebra a linha, escreve a indentação corrente e `text` (as linhas internas de `text` ficam como estão)."""
+        self.write("\n" + self._indent)
+        self.write(text)
+
+    @contextlib.contextmanager
+    def indented(self, prefix="    "):
+        """As linhas abertas com line() dentro do bloco ganham mais `prefix`."""
+        previous = self._indent
+        self._indent += prefix
+        try:
+            yield self
+        finally:
+            self._indent = previous
+
+    def flush(self):
+        if self.out is not None and self._parts:
+            self.out.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+    def getvalue(self) -> str:
+        """Tudo o que foi escrito (só sem `out`)."""
+        return "".join(self._parts)
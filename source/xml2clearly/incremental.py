@@ -0,0 +1,146 @@
+"""
+Retradução incremental: cada filho de topo do <unit> (função, decl_stmt,
+diretiva...) é identificado por um hash estrutural que ignora onde ele está no
+arquivo (linhas relativas ao início do próprio filho). Filhos sem mudança têm
+o texto reaproveitado do cache; só os novos ou alterados viram Tag e são
+traduzidos. O espaçamento entre filhos é o mesmo de translate_stream (iter_spacing).
+
+A tradução de um filho também depende dos símbolos declarados antes dele
+(uma chamada vira "call macro" se o nome é de uma macro), então a chave junta
+ao hash estrutural as entradas da tabela de símbolos para os nomes que o
+filho cita.
+"""
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from source.xml2clearly.context import TranslationContext
+from source.xml2clearly.symbols import SymbolTable, declare, symbol_table
+from source.xml2clearly.translate import iter_spacing, new_context, translate
+from source.xml2clearly.xml_manager import NSMAP, POS_END, POS_START, LazyTag, Tag, iter_unit_elements
+
+NAME_TAG = "{%s}name" % NSMAP["src"]
+
+
+@functools.lru_cache(maxsize=None)
+def translator_fingerprint() -> str:
+    """Hash do código dos tradutores: mudou o tradutor, o cache antigo não vale mais."""
+    digest = hashlib.sha256()
+    package = Path(__file__).parent
+    for path in sorted(package.rglob("*.py")):
+        digest.update(str(path.relative_to(package)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def structural_hash(elem) -> str:
+    """
+    Hash do que os tradutores leem de um elemento e da sua subárvore: nome,
+    texto, atributos ref/type e posições com a linha relativa ao início do
+    elemento (a coluna fica absoluta). Editar acima dele não muda o hash.
+    """
+    start = elem.get(POS_START)
+    base_line = int(start.split(":")[0]) if start else 0
+    positions = {}
+
+    def relative(pos):
+        if pos is None:
+            return ""
+        value = positions.get(pos)
+        if value is None:
+            line, col = pos.split(":")
+            value = positions[pos] = f"{int(line) - base_line}:{col}"
+        return value
+
+    digest = hashlib.blake2b(digest_size=16)
+    for node in elem.iter():
+        digest.update("\0".join((
+            node.tag if isinstance(node.tag, str) else "",
+            (node.text or "").strip(),
+            node.get("ref") or "",
+            node.get("type") or "",
+            relative(node.get(POS_START)),
+            relative(node.get(POS_END)),
+            str(len(node)),
+        )).encode())
+        digest.update(b"\1")
+    return digest.hexdigest()
+
+
+def cache_key(elem, child: LazyTag, table: SymbolTable) -> str:
+    """Hash estrutural mais o que a tabela de símbolos sabe dos nomes citados em `elem`."""
+    key = structural_hash(elem)
+    names = {node.text.strip() for node in elem.iter(NAME_TAG) if node.text}
+    visible = table.visible(names, child.start)
+    if visible:
+        key += hashlib.blake2b(repr(visible).encode(), digest_size=8).hexdigest()
+    return key
+
+
+class IncrementalCache:
+    """
+    Traduções por hash estrutural de um arquivo, persistidas em JSON em `path`
+    (sem `path`, só em memória). Cada execução guarda só os filhos que ainda
+    existem no arquivo.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.entries = {}
+        self.stats = Counter()  # hits, misses
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("fingerprint") == translator_fingerprint():
+            self.entries = data["entries"]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"fingerprint": translator_fingerprint(), "entries": self.entries}
+        # Escreve num temporário e renomeia: uma execução interrompida não corrompe o cache
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(tmp, self.path)
+
+
+def translate_incremental(xml_file, cache: IncrementalCache, ctx: TranslationContext = None) -> str:
+    """
+    Traduz o XML do srcML reaproveitando de `cache` os filhos de topo sem
+    mudança. Produz o mesmo texto que translate(generate_tag(xml_file)).
+    """
+    if ctx is None:
+        ctx = new_context()
+
+    entries = {}
+    translated = {}
+
+    def children():
+        # LazyTag para o espaçamento e a tabela de símbolos; a subárvore não é construída
+        for unit_tag, elem in iter_unit_elements(xml_file):
+            child = LazyTag(elem, unit_tag)
+            declare(child, ctx)
+            key = cache_key(elem, child, symbol_table(unit_tag, ctx))
+            text = cache.entries.get(key)
+            if text is None:
+                cache.stats["misses"] += 1
+                text = translate(Tag(elem, unit_tag), ctx)
+            else:
+                cache.stats["hits"] += 1
+            entries[key] = text
+            translated[child] = text
+            yield child
+
+    pieces = []
+    for child, spacing in iter_spacing(children()):
+        pieces.append(spacing + translated.pop(child))
+
+    cache.entries = entries
+    return "".join(pieces)
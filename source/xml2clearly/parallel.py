@@ -0,0 +1,101 @@
+"""
+Tradução de um único <unit> grande em paralelo: os filhos de topo são
+divididos em blocos contíguos, cada bloco vai serializado (etree.tostring)
+para um processo trabalhador — ou uma thread, em Python sem GIL — e os textos
+voltam em ordem. O espaçamento entre filhos é calculado no processo principal,
+com iter_spacing, e a tabela de símbolos do arquivo inteiro vai junto com cada
+bloco, então a saída é idêntica à de translate.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from lxml import etree
+
+from source.xml2clearly.symbols import SymbolTable
+from source.xml2clearly.translate import iter_spacing, new_context, translate
+from source.xml2clearly.xml_manager import LazyTag, Tag
+
+# Abaixo disso (em nós) o custo de serializar e despachar passa o de traduzir
+MIN_PARALLEL_NODES = 20_000
+# Blocos por trabalhador: mais blocos equilibram melhor unidades de tamanhos diferentes
+CHUNKS_PER_WORKER = 4
+
+
+def gil_disabled() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def default_executor(workers):
+    """Threads em Python sem GIL; processos caso contrário."""
+    if gil_disabled():
+        return ThreadPoolExecutor(workers)
+    return ProcessPoolExecutor(workers)
+
+
+def split_chunks(children, sizes, count):
+    """Divide `children` em até `count` blocos contíguos de tamanho (soma de `sizes`) parecido."""
+    target = sum(sizes) / count
+    chunks, chunk, filled = [], [], 0
+    for child, size in zip(children, sizes):
+        chunk.append(child)
+        filled += size
+        if filled >= target:
+            chunks.append(chunk)
+            chunk, filled = [], 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def translate_chunk(unit_name, serialized_children, symbols=None):
+    """
+    Trabalhador: reconstrói cada filho sob um <unit> vazio e devolve as
+    traduções. `symbols` é a SymbolTable do <unit> original.
+    """
+    parser = etree.XMLParser(huge_tree=True)
+    unit = Tag(etree.Element(unit_name))
+    ctx = new_context()
+    ctx.cache("symbols")[unit] = symbols or SymbolTable()
+    texts = []
+    for data in serialized_children:
+        texts.append(translate(Tag(etree.fromstring(data, parser), unit), ctx))
+    return texts
+
+
+def translate_parallel(xml_file, workers=None, executor=None, min_nodes=MIN_PARALLEL_NODES) -> str:
+    """
+    Traduz o XML do srcML dividindo os filhos do <unit> entre `workers`.
+    Produz o mesmo texto que translate(generate_tag(xml_file)); unidades
+    pequenas (menos de `min_nodes` nós) são traduzidas direto.
+    """
+    root = etree.parse(xml_file, etree.XMLParser(huge_tree=True)).getroot()
+    unit = LazyTag(root)
+    elems = list(root)
+    sizes = [sum(1 for _ in elem.iter()) for elem in elems]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(elems) < 2 or sum(sizes) < min_nodes:
+        return translate(Tag(root))
+
+    serialized = [etree.tostring(elem, with_tail=False) for elem in elems]
+    symbols = SymbolTable.from_unit(unit)
+    chunks = split_chunks(serialized, sizes, workers * CHUNKS_PER_WORKER)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = default_executor(workers)
+    try:
+        futures = [executor.submit(translate_chunk, root.tag, chunk, symbols) for chunk in chunks]
+        texts = [text for future in futures for text in future.result()]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    # Textos na ordem do documento; iter_spacing percorre os filhos na ordem de posição
+    by_elem = dict(zip(elems, texts))
+    pieces = []
+    for child, spacing in iter_spacing(unit.children):
+        pieces.append(spacing + by_elem[child._elem])
+    return "".join(pieces)
@@ -1,6 +1,8 @@
 # source/xml2clearly/pointers/resolve.py
 from source.xml2clearly.registry import register
 from source.xml2clearly.xml_manager import Tag
+from source.xml2clearly.context import TranslationContext
+from source.xml2clearly.type_analysis import analyze_type
 
 
 def resolve_pointer_notation(type_tag: Tag, ignore_storage_specifiers=True) -> str:
@@ -12,58 +14,25 @@ def resolve_pointer_notation(type_tag: Tag, ignore_storage_specifiers=True) -> s
     if not type_tag:
         return "void"
 
-    base_type = ""
-    pointer_depth = 0
-    storage_specifiers = {"static", "extern", "register", "auto", "typedef"} if ignore_storage_specifiers else set()
-
-    def extract_type_info(tag: Tag):
-        nonlocal base_type, pointer_depth
-
-        # Processa texto direto do elemento
-        if tag.text and tag.text.strip():
-            text = tag.text.strip()
-            if text not in storage_specifiers and not base_type:
-                base_type = text
-
-        # Processa filhos em ordem
-        for child in tag.children:
-            if child.name == "modifier" and child.text == "*":
-                pointer_depth += 1
-            elif child.name == "name" and child.text:
-                text = child.text.strip()
-                if text not in storage_specifiers and not base_type:
-                    base_type = text
-            elif child.name == "specifier" and child.text:
-                # Ignora especificadores de armazenamento se solicitado
-                text = child.text.strip()
-                if text not in storage_specifiers and not base_type:
-                    base_type = text
-            else:
-                # Recursivamente processa outros elementos
-                extract_type_info(child)
-
-    extract_type_info(type_tag)
-
+    info = analyze_type(type_tag)
     # Se não encontrou tipo base, assume void
-    if not base_type:
-        base_type = "void"
+    result_type = (info.pointer_base if ignore_storage_specifiers else info.first_word) or "void"
 
     # Aplica os ponteiros de dentro para fora
-    result_type = base_type
-    for _ in range(pointer_depth):
+    for _ in range(info.pointer_depth):
         result_type = f"ptr({result_type})"
 
     return result_type
 
 
 @register("type", priority=100)  # prioridade mais alta que outros tradutores
-def resolve_pointer_type(tag: Tag) -> str:
+def resolve_pointer_type(tag: Tag, ctx: TranslationContext) -> str:
     """Tradutor principal para tipos com ponteiros"""
     return resolve_pointer_notation(tag, ignore_storage_specifiers=True)
 
 
 @register("decl", priority=15)  # prioridade alta para sobrescrever o tradutor base
-def translate_pointer_decl(tag: Tag) -> str:
+def translate_pointer_decl(tag: Tag, ctx: TranslationContext) -> str:
     """Traduz declarações de variáveis com ponteiros"""
 
     # Nome da variável
@@ -80,23 +49,20 @@ def translate_pointer_decl(tag: Tag) -> str:
     # Verifica se há inicialização
     init_tags = tag.find_children("init")
     if init_tags:
-        from source.xml2clearly.translate import translate
-        init_str = translate(init_tags[0])
+        init_str = yield init_tags[0]
         return f"{var_name}: {type_str} = {init_str}"
     else:
         return f"{var_name}: {type_str}"
 
 
 @register("decl_stmt", priority=15)  # prioridade alta
-def translate_pointer_decl_stmt(tag: Tag) -> str:
+def translate_pointer_decl_stmt(tag: Tag, ctx: TranslationContext) -> str:
     """Traduz statements de declaração com ponteiros"""
-    from source.xml2clearly.translate import translate
-
     decls = tag.find_children("decl")
     parts = []
 
     for decl in decls:
-        translated = translate(decl)
+        translated = yield decl
         if translated and translated.strip():
             parts.append(translated.strip())
 
@@ -0,0 +1,163 @@
+"""
+Instrumentação opcional dos tradutores: por tag e por tradutor, quantas
+chamadas, quantas devolveram None (caíram no próximo), tempo inclusivo e
+exclusivo; quantos nós de cada tag chegaram ao fallback genérico; e quantas
+chamadas os predicados `applies` evitaram (registry.AVOIDED_CALLS).
+
+enable() troca as entradas de DISPATCH por versões cronometradas e
+disable() devolve as originais, então desligada ela não custa nada. O tempo
+exclusivo de um tradutor gerador soma só os trechos em que ele roda entre um
+`yield` e outro; os filhos que ele pede contam para os tradutores deles.
+Recursão da mesma função conta o tempo inclusivo mais de uma vez.
+"""
+import time
+from collections import Counter
+
+from source.xml2clearly import registry, translate as engine
+
+
+class TranslatorStats:
+    __slots__ = ("calls", "fell_through", "inclusive", "exclusive")
+
+    def __init__(self):
+        self.calls = 0
+        self.fell_through = 0  # devolveu None
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+
+
+# (tag, tradutor) -> TranslatorStats
+STATS = {}
+
+# tag -> nós que nenhum tradutor aceitou
+FALLBACKS = Counter()
+
+# Tempo dos tradutores aninhados no quadro corrente; a base acumula o nível de fora
+_frames = [0.0]
+
+
+def _timed(func, stats):
+    perf_counter = time.perf_counter
+
+    def timed(node, ctx):
+        _frames.append(0.0)
+        start = perf_counter()
+        try:
+            value = func(node, ctx)
+        finally:
+            elapsed = perf_counter() - start
+            nested = _frames.pop()
+            _frames[-1] += elapsed
+            stats.calls += 1
+            stats.inclusive += elapsed
+            stats.exclusive += elapsed - nested
+        if value is None:
+            stats.fell_through += 1
+        return value
+
+    return timed
+
+
+def _timed_continuation(func, stats):
+    perf_counter = time.perf_counter
+
+    def timed(node, ctx):
+        begin = perf_counter()
+        gen = value = error = None
+        try:
+            while True:
+                _frames.append(0.0)
+                start = perf_counter()
+                try:
+                    if gen is None:
+                        gen = func(node, ctx)
+                        request = next(gen)
+                    elif error is not None:
+                        request = gen.throw(error)
+                    else:
+                        request = gen.send(value)
+                except StopIteration as stop:
+                    if stop.value is None:
+                        stats.fell_through += 1
+                    return stop.value
+                finally:
+                    elapsed = perf_counter() - start
+                    nested = _frames.pop()
+                    _frames[-1] += elapsed
+                    stats.exclusive += elapsed - nested
+
+                error = None
+                try:
+                    value = yield request
+                except Exception as exc:
+                    error = exc
+        finally:
+            stats.calls += 1
+            stats.inclusive += perf_counter() - begin
+
+    return timed
+
+
+def _counted(applies, tag_name):
+    avoided = registry.AVOIDED_CALLS
+
+    def counted(node):
+        if applies(node):
+            return True
+        avoided[tag_name] += 1
+        return False
+
+    return counted
+
+
+def _count_fallback(node, ctx):
+    FALLBACKS[node.name] += 1
+
+
+FALLBACK_ENTRY = (_count_fallback, None, False)
+
+
+def _instrument(tag_name, entries):
+    wrapped = []
+    for func, applies, continuation in entries:
+        stats = STATS.setdefault((tag_name, func), TranslatorStats())
+        timed = _timed_continuation(func, stats) if continuation else _timed(func, stats)
+        wrapped.append((timed, _counted(applies, tag_name) if applies else None, continuation))
+    # Última entrada: só conta quem passou por todos os tradutores
+    wrapped.append(FALLBACK_ENTRY)
+    return tuple(wrapped)
+
+
+def enable():
+    """Liga a instrumentação (os contadores continuam de onde estavam)."""
+    registry.instrument(_instrument)
+    engine.UNREGISTERED = (FALLBACK_ENTRY,)
+
+
+def disable():
+    """Volta à tabela de despacho original."""
+    registry.instrument(None)
+    engine.UNREGISTERED = ()
+
+
+def reset():
+    STATS.clear()
+    FALLBACKS.clear()
+    registry.AVOIDED_CALLS.clear()
+    _frames[:] = [0.0]
+
+
+def format_report(limit=None) -> str:
+    """Relatório em texto, dos tradutores com mais tempo exclusivo para os com menos."""
+    rows = sorted(((key, stats) for key, stats in STATS.items() if stats.calls),
+                  key=lambda row: -row[1].exclusive)[:limit]
+    lines = [f"{'tag':<16} {'tradutor':<36} {'chamadas':>9} {'None':>8} {'incl. ms':>10} {'excl. ms':>10}"]
+    for (tag_name, func), stats in rows:
+        lines.append(f"{tag_name:<16} {func.__name__:<36} {stats.calls:>9} {stats.fell_through:>8} "
+                     f"{stats.inclusive * 1000:>10.1f} {stats.exclusive * 1000:>10.1f}")
+    if FALLBACKS:
+        lines.append("")
+        lines.append(f"{'fallback genérico':<18} {'nós':>9}")
+        for tag_name, count in FALLBACKS.most_common(limit):
+            lines.append(f"{tag_name:<18} {count:>9}")
+    return "\n".join(lines)
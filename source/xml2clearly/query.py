@@ -0,0 +1,120 @@
+"""
+Consultas por caminho compiladas e guardadas em cache.
+
+    query("expr/literal")   filhos <expr> e, dentro deles, filhos <literal>
+    query("//index")        qualquer <index> abaixo do nó (não o próprio nó)
+    query("name//index")    <index> abaixo dos filhos <name>
+    query("*")              qualquer filho
+
+Cada caminho é compilado uma vez (query tem cache). first() e exists() param
+no primeiro resultado. Em um LazyTag, caminhos com // descem direto no lxml
+(iterdescendants ou XPath): subárvores sem resultado não viram objetos. Cada
+resultado volta como o LazyTag da árvore, com a cadeia de pais certa; só as
+listas de filhos dos nós no caminho até ele são criadas. No Tag, um passo
+// não desce em subárvores cujo resumo (Tag.kinds) não tem o nome procurado.
+"""
+import functools
+import re
+
+from lxml import etree
+
+from source.xml2clearly.xml_manager import LazyTag, kind_bit
+
+_STEP = re.compile(r"(/{0,2})([^/]+)")
+
+
+class Query:
+    __slots__ = ("path", "steps", "_lxml")
+
+    def __init__(self, path: str):
+        self.path = path
+        # (descendente?, nome ou None para *)
+        self.steps = tuple((sep == "//", None if name == "*" else name) for sep, name in _STEP.findall(path))
+        self._lxml = self._compile_lxml()
+
+    def _compile_lxml(self):
+        """
+        Função elem -> iterador de elementos lxml que casam, na ordem do
+        documento. Só para caminhos com //: passos de filho já são baratos no Tag.
+        """
+        if not any(descendant for descendant, _ in self.steps):
+            return None
+        if len(self.steps) == 1:
+            descendant, name = self.steps[0]
+            tag = "{*}" + name if name else None
+            if descendant:
+                return lambda elem: elem.iterdescendants(tag)
+            return lambda elem: elem.iterchildren(tag)
+
+        expr = "." + "".join(("//" if descendant else "/") + (f"*[local-name()='{name}']" if name else "*")
+                             for descendant, name in self.steps)
+        xpath = etree.XPath(expr)
+        return lambda elem: iter(xpath(elem))
+
+    def iter(self, tag):
+        """Resultados em pré-ordem, gerados sob demanda."""
+        if self._lxml is not None and isinstance(tag, LazyTag):
+            for elem in self._lxml(tag._elem):
+                yield _lazy_for(tag, elem)
+            return
+
+        steps = self.steps
+        last = len(steps)
+        # Bit do nome de cada passo // com nome: subárvore sem ele não casa o passo
+        bits = tuple(kind_bit(name) if descendant and name is not None else 0 for descendant, name in steps)
+        # Pilha de (nó, estados): cada estado é o índice do próximo passo a casar nos
+        # filhos do nó; last é resultado. Cada nó sai da pilha uma vez só, com todos os
+        # estados que o alcançam, antes dos descendentes e dos irmãos seguintes
+        stack = [(tag, (0,))]
+        while stack:
+            node, states = stack.pop()
+            if last in states:
+                yield node
+            if len(states) == 1 and states[0] < last and not steps[states[0]][0] and steps[states[0]][1]:
+                # Só um passo de filho com nome: o índice por nome do nó já filtra
+                candidates = node.find_children(steps[states[0]][1])
+            else:
+                candidates = node.children
+            for child in reversed(candidates):
+                child_states = []
+                for step in states:
+                    if step == last:
+                        continue
+                    descendant, name = steps[step]
+                    if bits[step] and not child.kinds & bits[step]:
+                        continue
+                    if descendant and step not in child_states:
+                        child_states.append(step)
+                    if (name is None or child.name == name) and step + 1 not in child_states:
+                        child_states.append(step + 1)
+                if child_states:
+                    stack.append((child, tuple(child_states)))
+
+    def all(self, tag) -> list:
+        return list(self.iter(tag))
+
+    def first(self, tag):
+        return next(self.iter(tag), None)
+
+    def exists(self, tag) -> bool:
+        if self._lxml is not None and isinstance(tag, LazyTag):
+            return next(self._lxml(tag._elem), None) is not None
+        return next(self.iter(tag), None) is not None
+
+
+def _lazy_for(root: LazyTag, elem) -> LazyTag:
+    """LazyTag de `elem` (descendente de root._elem), descendo pelos filhos já criados."""
+    path = []
+    while elem is not root._elem:
+        path.append(elem)
+        elem = elem.getparent()
+    node = root
+    for elem in reversed(path):
+        node = node.child_for(elem)
+    return node
+
+
+@functools.lru_cache(maxsize=256)
+def query(path: str) -> Query:
+    """Query compilada de `path` (compilada uma vez por caminho)."""
+    return Query(path)
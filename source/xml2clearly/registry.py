@@ -1,11 +1,86 @@
-from collections import defaultdict
+import inspect
+from collections import Counter, defaultdict
 
 # Mapeia tag -> [(priority, function)]
 TRANSLATORS = defaultdict(list)
 
-def register(tag_name, priority=0):
+# Tradutores escritos como gerador: pedem a tradução de um nó com `yield node`
+# e recebem o texto de volta do motor, sem recursão em translate()
+CONTINUATIONS = set()
+
+# Predicados baratos opcionais: function -> applies(tag)
+PREDICATES = {}
+
+# Tabela compilada por freeze(): tag -> ((function, applies, is_continuation), ...)
+DISPATCH = {}
+
+# Tradutores de emissão: tag -> (tradutor str equivalente, func(tag, emitter, ctx)).
+# emit() só os usa quando o tradutor equivalente é o primeiro da tag
+EMITTERS = {}
+
+# Chamadas de tradutor evitadas porque applies(tag) deu False, por tag
+# (só contadas com a instrumentação ligada, ver profiling.enable)
+AVOIDED_CALLS = Counter()
+
+# Instrumentação opcional (ver profiling.enable): wrap(tag_name, entradas) -> entradas
+_instrument = None
+
+_frozen = False
+
+
+def register(tag_name, priority=0, applies=None):
+    """
+    Registra um tradutor func(tag, ctx) para `tag_name`. Com `applies`, o motor só
+    chama o tradutor quando applies(tag) é verdadeiro, em vez de chamá-lo e esperar None.
+    """
     def wrapper(func):
         TRANSLATORS[tag_name].append((priority, func))
         TRANSLATORS[tag_name].sort(key=lambda pair: -pair[0])
+        if inspect.isgeneratorfunction(func):
+            CONTINUATIONS.add(func)
+        if applies is not None:
+            PREDICATES[func] = applies
+        if _frozen:
+            DISPATCH[tag_name] = _compile(tag_name)
         return func
     return wrapper
+
+
+def register_emitter(tag_name, replaces):
+    """
+    Registra func(tag, emitter, ctx), que escreve em `emitter` o mesmo texto que
+    o tradutor `replaces` devolveria, sem montar a str inteira.
+    """
+    def wrapper(func):
+        EMITTERS[tag_name] = (replaces, func)
+        return func
+    return wrapper
+
+
+def _compile(tag_name):
+    entries = tuple(
+        (func, PREDICATES.get(func), func in CONTINUATIONS)
+        for _, func in TRANSLATORS[tag_name]
+    )
+    return _instrument(tag_name, entries) if _instrument else entries
+
+
+def freeze():
+    """Compila a tabela de despacho uma vez, depois que todos os tradutores foram registrados."""
+    global _frozen
+    DISPATCH.clear()
+    for tag_name in TRANSLATORS:
+        DISPATCH[tag_name] = _compile(tag_name)
+    _frozen = True
+
+
+def instrument(wrap):
+    """
+    Recompila DISPATCH passando as entradas de cada tag por wrap(tag_name, entradas).
+    instrument(None) volta à tabela original; sem instrumentação o custo é zero.
+    """
+    global _instrument
+    _instrument = wrap
+    if _frozen:
+        for tag_name in TRANSLATORS:
+            DISPATCH[tag_name] = _compile(tag_name)
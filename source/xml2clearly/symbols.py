@@ -0,0 +1,191 @@
+"""
+Tabela de símbolos de um <unit>: macros, funções, ponteiros de função,
+variáveis e typedefs declarados no topo do arquivo, cada um com a posição da
+declaração. Um símbolo só vale depois de declarado (como no C), então a tabela
+pode ser montada de uma vez (árvore inteira) ou filho a filho (streaming,
+tradução incremental) e dá as mesmas respostas.
+
+lookup_call_type consulta a tabela (e o escopo da função) em O(1) para dizer
+se uma chamada é de macro, ponteiro de função ou função.
+"""
+from source.xml2clearly.context import TranslationContext
+from source.xml2clearly.xml_manager import Tag
+
+
+def _name_text(tag: Tag) -> str | None:
+    name_tag = tag.find("name")
+    if name_tag is None:
+        return None
+    if name_tag.text:
+        return name_tag.text
+    # Arrays: <name><name>v</name><index>...</index></name>
+    inner = name_tag.find("name")
+    return inner.text if inner is not None and inner.text else None
+
+
+class SymbolTable:
+    def __init__(self):
+        self.macros = {}    # nome -> posição
+        self.symbols = {}   # nome -> (tipo, posição); tipo: "fn", "ptr" ou "var"
+        self.typedefs = {}  # nome -> (True se é ponteiro de função, posição)
+
+    @classmethod
+    def from_unit(cls, unit: Tag) -> "SymbolTable":
+        table = cls()
+        for child in unit.children:
+            table.declare(child)
+        return table
+
+    def declare(self, child: Tag):
+        """Registra o que um filho de topo do <unit> declara (a primeira declaração vale)."""
+        position = child.start
+        if child.name == "define":
+            macro = child.find("macro")
+            name = _name_text(macro) if macro is not None else None
+            if name:
+                self.macros.setdefault(name, position)
+        elif child.name == "typedef":
+            function = child.find("function_decl")
+            name = _name_text(function if function is not None else child)
+            if name:
+                is_pointer = function is not None and function.find("modifier") is not None
+                self.typedefs.setdefault(name, (is_pointer, position))
+        else:
+            for name, kind in self.declared_names(child):
+                self.symbols.setdefault(name, (kind, position))
+
+    def declared_names(self, node: Tag):
+        """(nome, tipo) de uma function, function_decl ou decl_stmt."""
+        if node.name in ("function", "function_decl"):
+            name = _name_text(node)
+            if name:
+                # <modifier>*</modifier> direto no function_decl: int (*fp)(int)
+                yield name, "ptr" if node.find("modifier") is not None else "fn"
+        elif node.name in ("decl_stmt", "decl"):
+            decls = node.find_children("decl") if node.name == "decl_stmt" else [node]
+            kind = "var"
+            for decl in decls:
+                type_tag = decl.find("type")
+                if type_tag is not None and type_tag.attrib.get("ref") != "prev":
+                    kind = "ptr" if self.is_function_pointer_type(type_tag) else "var"
+                name = _name_text(decl)
+                if name:
+                    yield name, kind
+
+    def is_function_pointer_type(self, type_tag: Tag) -> bool:
+        """Tipo é um typedef de ponteiro de função, sem modificadores (handler_t h)."""
+        if type_tag.find("modifier") is not None:
+            return False
+        name = type_tag.find("name")
+        entry = self.typedefs.get(name.text) if name is not None else None
+        return entry is not None and entry[0]
+
+    def lookup(self, name: str, position) -> str | None:
+        """Tipo de `name` declarado no topo antes de `position`: "macro", "fn", "ptr", "var" ou None."""
+        macro = self.macros.get(name)
+        if macro is not None and macro < position:
+            return "macro"
+        entry = self.symbols.get(name)
+        if entry is not None and entry[1] < position:
+            return entry[0]
+        return None
+
+    def visible(self, names, position) -> list:
+        """
+        (nome, tipo) das entradas para `names` declaradas antes de `position`:
+        tudo o que a tradução de um filho que cita esses nomes pode ter lido
+        daqui. Sem as posições, para não mudar quando o código desce.
+        """
+        found = []
+        for name in sorted(names):
+            macro = self.macros.get(name)
+            if macro is not None and macro < position:
+                found.append((name, "macro"))
+            entry = self.symbols.get(name)
+            if entry is not None and entry[1] < position:
+                found.append((name, entry[0]))
+            entry = self.typedefs.get(name)
+            if entry is not None and entry[1] < position:
+                found.append((name, "typedef ptr" if entry[0] else "typedef"))
+        return found
+
+
+def _ancestors(tag: Tag, ctx: TranslationContext):
+    """
+    (função que contém `tag` ou None, raiz da árvore). Sobe só até o primeiro
+    ancestral já resolvido neste contexto e guarda a resposta de cada nó do
+    caminho: chamadas aninhadas f(f(f(...))) não sobem até a raiz a cada nível.
+    """
+    resolved = ctx.cache("ancestors")
+    chain = []
+    node = tag
+    while node not in resolved:
+        chain.append(node)
+        if node.parent is None:
+            resolved[node] = (None, node)
+            chain.pop()
+            break
+        node = node.parent
+
+    # Desce preenchendo: a função de um nó é o pai, se ele for <function>, ou a do pai
+    for child in reversed(chain):
+        parent = child.parent
+        function, root = resolved[parent]
+        resolved[child] = (parent if parent.name == "function" else function, root)
+    return resolved[tag]
+
+
+def symbol_table(root: Tag, ctx: TranslationContext) -> SymbolTable:
+    """Tabela do <unit> `root` neste contexto, montada com os filhos que ele já tem."""
+    tables = ctx.cache("symbols")
+    table = tables.get(root)
+    if table is None:
+        table = tables[root] = SymbolTable.from_unit(root)
+    return table
+
+
+def declare(child: Tag, ctx: TranslationContext):
+    """
+    Registra um filho de topo que chega em streaming (o <unit> ainda não o tem).
+    Os ancestrais resolvidos são do filho anterior e saem junto com ele: em
+    streaming, a memória continua limitada ao maior filho de topo.
+    """
+    ctx.cache("ancestors").clear()
+    if child.parent is not None:
+        symbol_table(child.parent, ctx).declare(child)
+
+
+def function_scope(function: Tag, table: SymbolTable, ctx: TranslationContext) -> dict:
+    """
+    Nome -> tipo dos parâmetros e das declarações do primeiro nível do corpo.
+    Guarda só a última função: as chamadas de uma função são traduzidas juntas.
+    """
+    cache = ctx.cache("scope")
+    if cache.get("function") is not function:
+        scope = {}
+        parameters = function.find("parameter_list")
+        for parameter in parameters.find_children("parameter") if parameters is not None else ():
+            for node in parameter.children:
+                scope.update(table.declared_names(node))
+        block = function.find("block")
+        content = block.find("block_content") if block is not None else None
+        for statement in content.children if content is not None else ():
+            scope.update(table.declared_names(statement))
+        cache["function"], cache["names"] = function, scope
+    return cache["names"]
+
+
+def lookup_call_type(name: str, call: Tag, ctx: TranslationContext) -> str:
+    """"macro", "ptr" (ponteiro de função) ou "fn" para a chamada `call` de `name`."""
+    function, root = _ancestors(call, ctx)
+    table = symbol_table(root, ctx)
+    position = call.start
+
+    # Macros são expandidas antes de qualquer escopo
+    macro = table.macros.get(name)
+    if macro is not None and macro < position:
+        return "macro"
+    kind = function_scope(function, table, ctx).get(name) if function is not None else None
+    if kind is None:
+        kind = table.lookup(name, position)
+    return "ptr" if kind == "ptr" else "fn"
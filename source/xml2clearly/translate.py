@@ -1,39 +1,198 @@
-from source.xml2clearly.xml_manager import Tag
-from source.xml2clearly.registry import TRANSLATORS
+from source.xml2clearly.xml_manager import NO_END, NO_START, POS_SHIFT, Tag, iter_unit_children
+from source.xml2clearly.context import TranslationContext
+from source.xml2clearly.emitter import Emitter
+from source.xml2clearly.registry import DISPATCH, EMITTERS, freeze
+from source.xml2clearly.symbols import declare
 from source.xml2clearly.declarations import comments, variables, functions
 from source.xml2clearly.directives import include, macros  # garante o registro
 from source.xml2clearly.pointers import resolve  # garante o registro dos tradutores de ponteiros
 
-def compute_spacing(prev_end, curr_start):
-    prev_line, prev_col = prev_end
-    curr_line, curr_col = curr_start
+freeze()
 
-    if curr_line == prev_line:
-        return " " * max(1, curr_col - prev_col)
-    else:
-        return "\n" * max(1, curr_line - prev_line)
+# Entradas de despacho das tags sem tradutor registrado (profiling.enable troca)
+UNREGISTERED = ()
 
-def translate(tag: Tag) -> str:
-    translators = TRANSLATORS.get(tag.name, [])
+# Espaços entre irmãos na mesma linha: acima disso (código minificado ou
+# gerado, linhas de milhares de colunas) o espaçamento é truncado
+MAX_SPACES = 120
+_SPACES = tuple(" " * n for n in range(MAX_SPACES + 1))
+_NEWLINES = tuple("\n" * n for n in range(64))
 
-    for _, func in translators:
-        result = func(tag)
-        if result is not None:
-            return result
 
-    # fallback genérico com espaçamento proporcional
-    result = []
+def packed_spacing(prev_end: int, curr_start: int) -> str:
+    """
+    Espaçamento entre o fim do irmão anterior e o início do seguinte, com
+    posições empacotadas (linha << 32 | coluna): quebras de linha se mudam de
+    linha, senão espaços pela diferença de colunas (até MAX_SPACES).
+    """
+    lines = (curr_start >> POS_SHIFT) - (prev_end >> POS_SHIFT)
+    if lines == 0:
+        # Mesma linha: a diferença dos empacotados é a das colunas
+        return _SPACES[min(max(1, curr_start - prev_end), MAX_SPACES)]
+    lines = max(1, lines)
+    return _NEWLINES[lines] if lines < len(_NEWLINES) else "\n" * lines
+
+
+def new_context(**options) -> TranslationContext:
+    """Cria um contexto de tradução; reutilize-o para compartilhar caches entre chamadas."""
+    return TranslationContext(translate, **options)
+
+
+def translate(tag: Tag, ctx: TranslationContext = None) -> str:
+    """
+    Traduz um nó sem recursão Python: os tradutores geradores ficam suspensos
+    numa pilha explícita enquanto o nó que pediram (`yield child`) é traduzido.
+    Todo tradutor recebe (tag, ctx) e segue o contrato de sempre: str, ou None
+    para cair no próximo.
+    """
+    if ctx is None:
+        ctx = new_context()
+
+    stack = []  # quadros suspensos: (nó, índice do tradutor, gerador)
+    node, index = tag, 0  # nó a traduzir, a partir do tradutor `index`
+    value = error = None
+
+    while True:
+        if node is None:
+            # Entrega o texto (ou a exceção) ao gerador que pediu o nó
+            if not stack:
+                if error is not None:
+                    raise error
+                return value
+
+            owner, index, gen = stack.pop()
+            try:
+                if error is not None:
+                    exc, error = error, None
+                    request = gen.throw(exc)
+                else:
+                    request = gen.send(value)
+            except StopIteration as stop:
+                if stop.value is None:
+                    # Gerador desistiu: cai para o próximo tradutor do mesmo nó
+                    node, index = owner, index + 1
+                else:
+                    value = stop.value
+            except Exception as exc:
+                error = exc
+            else:
+                stack.append((owner, index, gen))
+                node, index = request, 0
+            continue
+
+        try:
+            translators = DISPATCH.get(node.name, UNREGISTERED)
+            request = None
+
+            while index < len(translators):
+                func, applies, continuation = translators[index]
+                if applies is not None and not applies(node):
+                    index += 1
+                    continue
+
+                if continuation:
+                    gen = func(node, ctx)
+                    try:
+                        request = gen.send(None)
+                    except StopIteration as stop:
+                        value = stop.value
+                    else:
+                        break
+                else:
+                    value = func(node, ctx)
+
+                if value is not None:
+                    break
+                index += 1
+            else:
+                # fallback genérico com espaçamento proporcional
+                if node.children:
+                    gen = translate_generic(node)
+                    request = gen.send(None)
+                else:
+                    value = ""
+
+            if request is None:
+                node = None
+            else:
+                stack.append((node, index, gen))
+                node, index = request, 0
+        except Exception as exc:
+            node, error = None, exc
+
+
+def iter_spacing(children):
+    """Gera (filho, espaçamento antes dele), proporcional às posições no código original."""
     prev_end = None
 
-    for child in tag.children:
+    for child in children:
         spacing = ""
-        if prev_end and hasattr(child, "start"):
-            spacing = compute_spacing(prev_end, child.start)
+        start = child.packed_start
+        if prev_end is not None and start != NO_START:
+            spacing = packed_spacing(prev_end, start)
+
+        yield child, spacing
+
+        end = child.packed_end
+        if end != NO_END:
+            prev_end = end
+
+
+def translate_generic(tag: Tag):
+    """Fallback genérico: junta a tradução dos filhos com o espaçamento original."""
+    result = []
+    for child, spacing in iter_spacing(tag.children):
+        result.append(spacing + (yield child))
+    return "".join(result)
+
+
+def emit(tag: Tag, out: Emitter, ctx: TranslationContext = None):
+    """
+    Escreve a tradução de `tag` em `out`, com o mesmo texto de translate(tag).
+    Nós sem tradutor (o <unit>, por exemplo) são escritos filho a filho e nós
+    com tradutor de emissão (register_emitter) escrevem direto; o resto passa
+    por translate. Nenhuma str do tamanho da saída inteira é montada.
+    """
+    if ctx is None:
+        ctx = new_context()
+
+    pending = [iter(((tag, ""),))]
+    while pending:
+        item = next(pending[-1], None)
+        if item is None:
+            pending.pop()
+            continue
+        node, spacing = item
+        out.write(spacing)
+
+        translators = DISPATCH.get(node.name, UNREGISTERED)
+        if not translators:
+            # Fallback genérico em streaming
+            pending.append(iter_spacing(node.children))
+            continue
+
+        emitter = EMITTERS.get(node.name)
+        if emitter is not None and translators[0][0] is emitter[0]:
+            applies = translators[0][1]
+            if applies is None or applies(node):
+                emitter[1](node, out, ctx)
+                continue
+        out.write(translate(node, ctx))
 
-        result.append(spacing + translate(child))
 
-        end_str = child.attrib.get("{http://www.srcML.org/srcML/position}end")
-        if end_str:
-            prev_end = tuple(map(int, end_str.split(":")))
+def translate_stream(xml_file, out, ctx: TranslationContext = None):
+    """
+    Tradução em streaming: lê um filho de topo do <unit> por vez, traduz e
+    escreve em `out` (qualquer objeto com write). Produz o mesmo texto que
+    translate(generate_tag(xml_file)).
+    """
+    if ctx is None:
+        ctx = new_context()
 
-    return "".join(result)
\ No newline at end of file
+    emitter = Emitter(out)
+    for child, spacing in iter_spacing(iter_unit_children(xml_file)):
+        # Em streaming o <unit> não tem os filhos: a tabela de símbolos cresce aqui
+        declare(child, ctx)
+        emitter.write(spacing)
+        emit(child, emitter, ctx)
+    emitter.flush()
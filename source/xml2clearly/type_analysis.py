@@ -0,0 +1,186 @@
+"""
+Análise única dos <type>: uma passada sobre a subárvore gera uma chave
+estrutural (nome, texto e número de filhos de cada nó, em pré-ordem) e a
+análise dessa chave vira um CType imutável, guardado num cache LRU. O mesmo
+punhado de tipos aparece milhares de vezes num projeto; cada tipo diferente é
+analisado uma vez só.
+
+As funções de tipo (helpers.translate_type, resolve_pointer_notation,
+extract_type_text, extract_storage_specifiers) só formatam campos do CType;
+first_word e pointer_base saem das palavras em ordem.
+"""
+import functools
+from typing import NamedTuple
+
+from source.xml2clearly.xml_manager import Tag
+
+STORAGE_SPECIFIERS = frozenset({"static", "extern", "register", "auto", "typedef"})
+QUALIFIERS = frozenset({"const", "volatile", "restrict", "_Atomic"})
+
+# Tipos distintos guardados; um projeto costuma ter poucas centenas
+TYPE_CACHE_SIZE = 4096
+
+
+class CType(NamedTuple):
+    base: str               # nomes do tipo juntos ("unsigned long"), "" se não há
+    qualifiers: tuple       # const, volatile... na ordem do código
+    storage: tuple          # static, extern... (só no texto do <type> e nos filhos diretos)
+    pointer_depth: int      # quantos <modifier>*</modifier>
+    array_dims: tuple       # texto de cada <index> dentro do tipo, sem colchetes
+    words: tuple            # todos os textos na ordem do código (helpers.translate_type)
+    # extract_type_text só olha os filhos diretos (struct point * vira "*"): não sai dos campos acima
+    text: str
+
+    @property
+    def first_word(self) -> str:
+        """Primeira palavra que não é *, com armazenamento."""
+        return _first_word(self.words, ())
+
+    @property
+    def pointer_base(self) -> str:
+        """
+        Base de resolve_pointer_notation: a primeira palavra sem armazenamento.
+        Qualificadores contam (const char * vira ptr(const)), como nas traduções
+        existentes; mudar isso é mudar a saída, não a análise.
+        """
+        return _first_word(self.words, STORAGE_SPECIFIERS)
+
+
+def _first_word(words, skip):
+    for word in words:
+        word = word.strip()
+        if word and word != "*" and word not in skip:
+            return word
+    return ""
+
+
+def type_key(type_tag: Tag) -> tuple:
+    """Chave estrutural da subárvore: (nome, texto, nº de filhos) de cada nó, em pré-ordem."""
+    key = []
+    stack = [type_tag]
+    while stack:
+        node = stack.pop()
+        children = node.children
+        key += (node.name, node.text, len(children))
+        if children:
+            stack.extend(reversed(children))
+    return tuple(key)
+
+
+def _build(key):
+    """Reconstrói a árvore (nome, texto, filhos) a partir da chave."""
+    root = None
+    pending = []  # [nó, filhos que ainda faltam]
+    for i in range(0, len(key), 3):
+        node = (key[i], key[i + 1] or "", [])
+        if pending:
+            parent = pending[-1]
+            parent[0][2].append(node)
+            parent[1] -= 1
+            if not parent[1]:
+                pending.pop()
+        else:
+            root = node
+        if key[i + 2]:
+            pending.append([node, key[i + 2]])
+    return root
+
+
+def _words(node, out):
+    name, text, children = node
+    if name in ("specifier", "name", "modifier"):
+        for child in children:
+            _words(child, out)
+        if text:
+            out.append(text)
+    else:
+        if text:
+            out.append(text)
+        for child in children:
+            _words(child, out)
+
+
+def _pointer_depth(root):
+    """Profundidade de ponteiro, no percurso de resolve_pointer_notation."""
+    depth = 0
+    stack = [root]
+    while stack:
+        for child in stack.pop()[2]:
+            name, child_text, _ = child
+            if name == "modifier" and child_text == "*":
+                depth += 1
+            elif not (name in ("name", "specifier") and child_text):
+                stack.append(child)
+    return depth
+
+
+def _flatten(node):
+    texts = [node[1]] if node[1] else []
+    for child in node[2]:
+        texts += _flatten(child)
+    return texts
+
+
+def _type_text(root) -> str:
+    _, text, children = root
+    parts = []
+    text = text.strip()
+    if text and text not in STORAGE_SPECIFIERS:
+        parts.append(text)
+    for name, child_text, _ in children:
+        if not child_text:
+            continue
+        child_text = child_text.strip()
+        if name == "modifier" or (name in ("name", "specifier") and child_text not in STORAGE_SPECIFIERS):
+            parts.append(child_text)
+
+    if not parts:
+        # Busca mais ampla: todos os textos, pulando especificadores de armazenamento
+        def collect(node):
+            name, node_text, node_children = node
+            node_text = node_text.strip()
+            if node_text and node_text not in STORAGE_SPECIFIERS:
+                parts.append(node_text)
+            for child in node_children:
+                if child[0] != "specifier" or (child[1] and child[1].strip() not in STORAGE_SPECIFIERS):
+                    collect(child)
+
+        collect(root)
+    return " ".join(parts).strip() or "void"
+
+
+@functools.lru_cache(maxsize=TYPE_CACHE_SIZE)
+def analyze_key(key: tuple) -> CType:
+    root = _build(key)
+
+    storage = []
+    root_text = root[1].strip()
+    if root_text in STORAGE_SPECIFIERS:
+        storage.append(root_text)
+    for name, text, _ in root[2]:
+        if name == "specifier" and text and text.strip() in STORAGE_SPECIFIERS:
+            storage.append(text.strip())
+
+    names = []
+    qualifiers = []
+    array_dims = []
+    stack = [root]
+    while stack:
+        name, text, children = stack.pop()
+        if name == "name" and text and text.strip() not in STORAGE_SPECIFIERS:
+            names.append(text.strip())
+        elif name == "specifier" and text.strip() in QUALIFIERS:
+            qualifiers.append(text.strip())
+        elif name == "index":
+            array_dims.append("".join(_flatten((name, "", children))).strip("[] "))
+        stack.extend(reversed(children))
+
+    words = []
+    _words(root, words)
+    return CType(" ".join(names), tuple(qualifiers), tuple(storage), _pointer_depth(root), tuple(array_dims),
+                 tuple(words), _type_text(root))
+
+
+def analyze_type(type_tag: Tag) -> CType:
+    """CType de um <type>, analisado uma vez por estrutura distinta."""
+    return analyze_key(type_key(type_tag))
@@ -1,65 +1,137 @@
+import sys
+from types import MappingProxyType
+
 from lxml import etree
 
 NSMAP = {"src": "http://www.srcML.org/srcML/src", "cpp": "http://www.srcML.org/srcML/cpp"}
 
 
-class Tag:
-    def __init__(self, elem, parent=None):
-        self.name = etree.QName(elem).localname
-        self.attrib = dict(elem.attrib)
+POS_START = "{http://www.srcML.org/srcML/position}start"
+POS_END = "{http://www.srcML.org/srcML/position}end"
 
-        # Extrai posições pos:start e pos:end como tuplas (linha, coluna)
-        start_str = self.attrib.get("{http://www.srcML.org/srcML/position}start")
-        end_str = self.attrib.get("{http://www.srcML.org/srcML/position}end")
+# Únicos atributos lidos pelos tradutores; o resto do XML não é copiado
+KEPT_ATTRIBS = frozenset({"ref", "type", POS_START, POS_END})
+EMPTY_ATTRIB = MappingProxyType({})
 
-        self.start = tuple(map(int, start_str.split(":"))) if start_str else (float("inf"), float("inf"))
-        self.end = tuple(map(int, end_str.split(":"))) if end_str else (float("-inf"), float("-inf"))
+# Posições "linha:coluna" guardadas num único int (linha << 32 | coluna)
+POS_SHIFT = 32
+POS_MASK = (1 << POS_SHIFT) - 1
+NO_START = sys.maxsize  # sem pos:start, ordena por último (como (inf, inf))
+NO_END = -1
 
-        self.text = (elem.text or "").strip()
-        self.parent = parent
+# Com menos filhos que isso, varrer a lista sai mais barato que montar o índice
+INDEX_MIN_CHILDREN = 8
 
-        # Herda indentação do pai, mas +1 se o pai é um <block>
-        if parent:
-            self.indent_level = parent.indent_level + 1 if parent.name == "block" else parent.indent_level
-        else:
-            self.indent_level = 0
+# Cache de "{namespace}nome" -> nome local internado
+_LOCALNAMES = {}
+
+# Nome de tag -> bit no resumo de subárvore (Tag.kinds); bits novos conforme aparecem
+_KIND_BITS = {}
 
-        # Constrói filhos com referência ao self como parent
-        self.children = [Tag(child, self) for child in elem]
 
-        # Ordena filhos pela posição no código original
-        self.children.sort(key=lambda c: c.start)
+def pack_position(pos_str):
+    """Converte "12:5" em um int ordenável."""
+    line, col = pos_str.split(":")
+    return int(line) << POS_SHIFT | int(col)
+
+
+def unpack_position(packed):
+    return packed >> POS_SHIFT, packed & POS_MASK
+
+
+def kind_bit(name):
+    bit = _KIND_BITS.get(name)
+    if bit is None:
+        bit = _KIND_BITS[name] = 1 << len(_KIND_BITS)
+    return bit
+
+
+def localname(elem):
+    qname = elem.tag
+    name = _LOCALNAMES.get(qname)
+    if name is None:
+        name = _LOCALNAMES[qname] = sys.intern(etree.QName(elem).localname)
+    return name
+
+
+class TagBase:
+    """API de consulta comum aos backends de Tag (cópia compacta e visão preguiçosa)."""
+    __slots__ = ()
 
     def __repr__(self):
         return f"Tag(name={self.name}, indent={self.indent_level}, children={len(self.children)})"
 
-    def walk(self):
-        yield self
-        for child in self.children:
-            yield from child.walk()
+    def walk(self, prune=None):
+        """
+        Pré-ordem com pilha explícita: árvores profundas não estouram a recursão.
+        Com `prune`, os nós em que prune(nó) é verdadeiro são gerados, mas os
+        filhos deles não são visitados.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            if prune is None or not prune(node):
+                stack.extend(reversed(node.children))
+
+    def has_kind(self, name: str) -> bool:
+        """Há algum nó `name` na subárvore (o próprio incluído)? O(1), pelo resumo `kinds`."""
+        return bool(self.kinds & kind_bit(name))
+
+    def find_first(self, name: str, prune=None):
+        """Primeiro nó `name` da subárvore (o próprio incluído), em pré-ordem; para no primeiro."""
+        if not self.has_kind(name):
+            return None
+        for node in self.walk(prune):
+            if node.name == name:
+                return node
+        return None
+
+    def _child_index(self) -> dict:
+        """Nome -> filhos com esse nome (na ordem), montado no primeiro uso."""
+        index = self._index
+        if index is None:
+            index = self._index = {}
+            for child in self.children:
+                index.setdefault(child.name, []).append(child)
+        return index
 
     def find_children(self, name):
-        return [c for c in self.children if c.name == name]
+        children = self.children
+        if len(children) < INDEX_MIN_CHILDREN:
+            return [c for c in children if c.name == name]
+        return list(self._child_index().get(name, ()))
 
     def search(self, path: str):
-        parts = path.strip("/").split("/")
-        return self._search_path(parts)
-
-    def _search_path(self, parts):
-        if not parts:
-            return [self]
-        next_name = parts[0]
-        matches = [child for child in self.children if child.name == next_name]
-        results = []
-        for match in matches:
-            results += match._search_path(parts[1:])
-        return results
+        """Nós em `path` ("expr/literal", "//index"...), ver source.xml2clearly.query."""
+        from source.xml2clearly.query import query  # query importa este módulo
+        return query(path).all(self)
 
     def find(self, name: str) -> 'Tag' or None:
-        for child in self.children:
-            if child.name == name:
-                return child
-        return None
+        children = self.children
+        if len(children) < INDEX_MIN_CHILDREN:
+            for child in children:
+                if child.name == name:
+                    return child
+            return None
+        found = self._child_index().get(name)
+        return found[0] if found else None
+
+    @property
+    def start_line(self) -> int:
+        """Linha de pos:start (0 sem posição)."""
+        packed = self.packed_start
+        return 0 if packed == NO_START else packed >> POS_SHIFT
+
+    @property
+    def end_line(self) -> int:
+        """Linha de pos:end (0 sem posição)."""
+        packed = self.packed_end
+        return 0 if packed == NO_END else packed >> POS_SHIFT
+
+    def spans_lines(self) -> bool:
+        """O nó ocupa mais de uma linha no código original."""
+        return self.end_line > self.start_line
 
     def find_text(self, name: str) -> str or None:
         node = self.find(name)
@@ -68,7 +140,310 @@ class Tag:
         return None
 
 
-def generate_tag(xml_file):
-    tree = etree.parse(xml_file)
+class Tag(TagBase):
+    __slots__ = ("name", "attrib", "text", "parent", "indent_level", "children", "kinds", "_start", "_end", "_index")
+
+    def __init__(self, elem, parent=None):
+        # Posições repetem muito (decl_stmt, decl e type começam no mesmo ponto):
+        # cada "linha:coluna" é convertido uma vez e a string/int são compartilhados
+        positions = {}
+        self._init_node(elem, parent, positions)
+        self.children = []
+
+        # Constrói a subárvore com pilha explícita (sem recursão)
+        created = []
+        pending = [(self, elem)]
+        while pending:
+            node, node_elem = pending.pop()
+            children = []
+            for child_elem in node_elem:
+                child = Tag.__new__(Tag)
+                child._init_node(child_elem, node, positions)
+                children.append(child)
+                pending.append((child, child_elem))
+            created += children
+
+            # Ordena filhos pela posição no código original
+            if len(children) > 1:
+                children.sort(key=_start_key)
+            node.children = children
+
+        # Resumo de baixo para cima: cada nó foi criado depois do pai, então
+        # percorrer ao contrário soma os filhos antes de o pai ser somado ao avô
+        for node in reversed(created):
+            node.parent.kinds |= node.kinds
+
+    def _init_node(self, elem, parent, positions):
+        self.name = localname(elem)
+        self.kinds = kind_bit(self.name)
+        self._start = NO_START
+        self._end = NO_END
+        self._index = None
+
+        attrib = None
+        for key, value in elem.items():
+            if key not in KEPT_ATTRIBS:
+                continue
+            if attrib is None:
+                attrib = {}
+            if key == POS_START or key == POS_END:
+                entry = positions.get(value)
+                if entry is None:
+                    entry = positions[value] = (value, pack_position(value))
+                value, packed = entry
+                if key == POS_START:
+                    self._start = packed
+                else:
+                    self._end = packed
+            attrib[key] = value
+        self.attrib = attrib or EMPTY_ATTRIB
+
+        self.text = (elem.text or "").strip()
+        self.parent = parent
+
+        # Herda indentação do pai, mas +1 se o pai é um <block>
+        if parent:
+            self.indent_level = parent.indent_level + 1 if parent.name == "block" else parent.indent_level
+        else:
+            self.indent_level = 0
+
+    @property
+    def packed_start(self) -> int:
+        """pos:start empacotado (NO_START sem posição)."""
+        return self._start
+
+    @property
+    def packed_end(self) -> int:
+        """pos:end empacotado (NO_END sem posição)."""
+        return self._end
+
+    @property
+    def start(self):
+        """Posição pos:start como tupla (linha, coluna)."""
+        if self._start == NO_START:
+            return float("inf"), float("inf")
+        return unpack_position(self._start)
+
+    @property
+    def end(self):
+        """Posição pos:end como tupla (linha, coluna)."""
+        if self._end == NO_END:
+            return float("-inf"), float("-inf")
+        return unpack_position(self._end)
+
+def _start_key(tag):
+    return tag._start
+
+
+class LazyTag(TagBase):
+    """
+    Visão sobre o elemento lxml, sem copiar a árvore: children, attrib, text,
+    start/end e indent_level são calculados no primeiro acesso e guardados.
+    Subárvores que nenhum tradutor visita nunca viram objetos Python.
+    """
+    __slots__ = ("name", "parent", "_elem", "_children", "_attrib", "_text", "_start", "_end", "_indent_level", "_index", "_kinds",
+                 "_by_elem")
+
+    def __init__(self, elem, parent=None):
+        self.name = localname(elem)
+        self.parent = parent
+        self._elem = elem
+        self._children = None
+        self._attrib = None
+        self._text = None
+        self._start = None
+        self._end = None
+        self._indent_level = None
+        self._index = None
+        self._kinds = None
+        self._by_elem = None
+
+    @property
+    def children(self):
+        if self._children is None:
+            children = [LazyTag(child, self) for child in self._elem]
+            # Ordena filhos pela posição no código original
+            if len(children) > 1:
+                children.sort(key=LazyTag._packed_start)
+            self._children = children
+        return self._children
+
+    def child_for(self, elem) -> "LazyTag":
+        """Filho cujo elemento lxml é `elem`, por um mapa montado uma vez por nó."""
+        if self._by_elem is None:
+            self._by_elem = {child._elem: child for child in self.children}
+        return self._by_elem[elem]
+
+    @property
+    def kinds(self):
+        """
+        Bits (kind_bit) dos nomes presentes na subárvore, calculados no primeiro
+        uso de baixo para cima (pilha explícita), reaproveitando os dos filhos.
+        """
+        if self._kinds is None:
+            stack = [(self, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if expanded:
+                    kinds = kind_bit(node.name)
+                    for child in node._children:
+                        kinds |= child._kinds
+                    node._kinds = kinds
+                    continue
+                stack.append((node, True))
+                for child in node.children:
+                    if child._kinds is None:
+                        stack.append((child, False))
+        return self._kinds
+
+    @property
+    def attrib(self):
+        if self._attrib is None:
+            self._attrib = self._elem.attrib
+        return self._attrib
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = (self._elem.text or "").strip()
+        return self._text
+
+    @property
+    def start(self):
+        """Posição pos:start como tupla (linha, coluna)."""
+        packed = self._packed_start()
+        if packed == NO_START:
+            return float("inf"), float("inf")
+        return unpack_position(packed)
+
+    @property
+    def end(self):
+        """Posição pos:end como tupla (linha, coluna)."""
+        packed = self.packed_end
+        if packed == NO_END:
+            return float("-inf"), float("-inf")
+        return unpack_position(packed)
+
+    @property
+    def packed_start(self) -> int:
+        return self._packed_start()
+
+    @property
+    def packed_end(self) -> int:
+        if self._end is None:
+            end_str = self._elem.get(POS_END)
+            self._end = pack_position(end_str) if end_str else NO_END
+        return self._end
+
+    @property
+    def indent_level(self):
+        if self._indent_level is None:
+            # Sobe até o primeiro ancestral já calculado e desce preenchendo (sem recursão)
+            chain = []
+            node = self
+            while node is not None and node._indent_level is None:
+                chain.append(node)
+                node = node.parent
+            for node in reversed(chain):
+                parent = node.parent
+                if parent is None:
+                    node._indent_level = 0
+                else:
+                    # Herda indentação do pai, mas +1 se o pai é um <block>
+                    node._indent_level = parent._indent_level + 1 if parent.name == "block" else parent._indent_level
+        return self._indent_level
+
+    def _packed_start(self):
+        if self._start is None:
+            start_str = self._elem.get(POS_START)
+            self._start = pack_position(start_str) if start_str else NO_START
+        return self._start
+
+
+def generate_tag(xml_file, lazy=False):
+    """Carrega o XML do srcML. Com lazy=True devolve um LazyTag sobre a árvore lxml."""
+    # huge_tree libera o limite de profundidade do libxml2 para código gerado muito aninhado
+    tree = etree.parse(xml_file, etree.XMLParser(huge_tree=True))
+    if lazy:
+        return LazyTag(tree.getroot())
     root_tag = Tag(tree.getroot())
     return root_tag
+
+
+def iter_unit_children(xml_file):
+    """
+    Percorre o XML com iterparse e gera um Tag por filho direto do <unit>
+    (função, decl_stmt, diretiva...), liberando cada elemento depois de usado.
+    O pico de memória depende do maior construto de topo, não do arquivo.
+    """
+    for unit_tag, elem in iter_unit_elements(xml_file):
+        yield Tag(elem, unit_tag)
+
+
+def iter_unit_elements(xml_file):
+    """Como iter_unit_children, mas gera (Tag do unit, elemento lxml do filho), válido até o próximo."""
+    depth = 0
+    unit_elem = None
+    unit_tag = None
+
+    for event, elem in etree.iterparse(xml_file, events=("start", "end"), huge_tree=True):
+        if event == "start":
+            depth += 1
+            if depth == 1:
+                # O lxml já leu adiante no evento start: copiar os filhos que ele tem
+                # declararia na tabela de símbolos nós ainda não gerados. Só o nó do unit
+                unit_elem = elem
+                unit_tag = Tag.__new__(Tag)
+                unit_tag._init_node(elem, None, {})
+                unit_tag.children = []
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+
+        yield unit_tag, elem
+
+        # Descarta o elemento já traduzido e os irmãos anteriores
+        elem.clear()
+        while elem.getprevious() is not None:
+            del unit_elem[0]
+
+
+def iter_archive_units(xml_file):
+    """
+    Percorre um arquivo (archive) do srcML com vários <unit> e gera
+    (filename, Tag) para cada arquivo C, liberando cada unidade depois de usada.
+    Cada Tag é a raiz de uma unidade, como a devolvida por generate_tag.
+    Um XML de arquivo único gera uma só unidade.
+    """
+    for elem in iter_archive_elements(xml_file):
+        yield elem.get("filename"), Tag(elem)
+
+
+def iter_archive_elements(xml_file):
+    """Como iter_archive_units, mas gera os elementos lxml de cada <unit> (válidos até o próximo)."""
+    depth = 0
+    archive_elem = None
+    nested = False
+
+    for event, elem in etree.iterparse(xml_file, events=("start", "end"), huge_tree=True):
+        if event == "start":
+            depth += 1
+            if depth == 1:
+                archive_elem = elem
+            elif depth == 2 and localname(elem) == "unit":
+                nested = True
+            continue
+
+        depth -= 1
+        if depth == 0 and not nested:
+            # Não é archive: a própria raiz é a unidade
+            yield elem
+        elif depth == 1 and localname(elem) == "unit":
+            yield elem
+
+            # Descarta a unidade já usada e as anteriores
+            elem.clear()
+            while elem.getprevious() is not None:
+                del archive_elem[0]
@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from source import async_pipeline
+from source.async_pipeline import run_pipeline
+from source.srcml_cache import SrcmlCache
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'functions.xml')
+
+
+def test_pipeline_translates_and_isolates_failures(tmp_path, monkeypatch):
+    # srcML falso: falha para broken.c, senão responde com o XML da amostra
+    script = tmp_path / "srcml"
+    script.write_text(
+        "#!/bin/sh\n"
+        "case \"$*\" in *broken*) echo 'erro' >&2; exit 2;; esac\n"
+        f"cat \"{os.path.abspath(XML_PATH)}\"\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("CCLEARLY_SRCML", str(script))
+    paths = [tmp_path / f"{name}.c" for name in ("a", "b", "broken", "c", "d")]
+
+    with ThreadPoolExecutor(2) as executor:
+        report = asyncio.run(run_pipeline(paths, lambda path: tmp_path / "out" / f"{path.name}.clearly",
+                                          srcml_jobs=2, translate_jobs=2, queue_size=1, executor=executor))
+
+    assert list(report.failures) == [tmp_path / "broken.c"]
+    assert "erro" in report.failures[tmp_path / "broken.c"]
+    assert (tmp_path / "out" / "d.c.clearly").read_text() == translate(generate_tag(XML_PATH))
+    assert [stage.items for stage in report.stages] == [5, 4, 4]
+    assert "srcml" in report.format()
+
+
+def test_pipeline_uses_cache_and_timeout(tmp_path, monkeypatch):
+    # srcML falso: conta as execuções e demora para slow.c
+    script = tmp_path / "srcml"
+    script.write_text(
+        "#!/bin/sh\n"
+        f"echo run >> \"{tmp_path}/runs\"\n"
+        "case \"$*\" in *slow*) exec sleep 5;; esac\n"
+        f"cat \"{os.path.abspath(XML_PATH)}\"\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("CCLEARLY_SRCML", str(script))
+    paths = [tmp_path / f"{name}.c" for name in ("a", "slow")]
+    for path in paths:
+        path.write_text(f"int {path.stem};\n")
+    cache = SrcmlCache(tmp_path / "cache", version="teste")
+
+    def run():
+        with ThreadPoolExecutor(1) as executor:
+            return asyncio.run(run_pipeline(paths, lambda path: tmp_path / "out" / f"{path.name}.clearly",
+                                            srcml_jobs=2, translate_jobs=1, executor=executor,
+                                            timeout=0.5, cache=cache))
+
+    report = run()
+    assert list(report.failures) == [tmp_path / "slow.c"]
+    assert report.failures[tmp_path / "slow.c"].startswith("timeout")
+
+    run()
+    # a.c veio do cache na segunda vez; slow.c estourou de novo
+    assert (tmp_path / "runs").read_text().count("run") == 3
+    assert (tmp_path / "out" / "a.c.clearly").read_text() == translate(generate_tag(XML_PATH))
+
+
+def test_cache_failures_stay_per_file(tmp_path, monkeypatch):
+    # srcML falso cujo --version falha: a chave do cache não pode ser calculada
+    script = tmp_path / "srcml"
+    script.write_text("#!/bin/sh\ncase \"$*\" in *--version*) exit 3;; esac\n"
+                      f"cat \"{os.path.abspath(XML_PATH)}\"\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("CCLEARLY_SRCML", str(script))
+    paths = [tmp_path / "a.c", tmp_path / "b.c"]
+    for path in paths:
+        path.write_text("int a;\n")
+
+    with ThreadPoolExecutor(1) as executor:
+        report = asyncio.run(run_pipeline(paths, lambda path: tmp_path / f"{path.name}.clearly", srcml_jobs=1,
+                                          translate_jobs=1, executor=executor, cache=SrcmlCache(tmp_path / "xml")))
+
+    assert list(report.failures) == paths
+    assert all("CalledProcessError" in error for error in report.failures.values())
+
+
+def test_timeout_interrupts_a_runaway_translation(tmp_path, monkeypatch):
+    # Tradução que não termina: o SIGALRM no trabalhador tem que interrompê-la
+    script = tmp_path / "srcml"
+    script.write_text(f"#!/bin/sh\ncat \"{os.path.abspath(XML_PATH)}\"\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("CCLEARLY_SRCML", str(script))
+    monkeypatch.setattr(async_pipeline, "translate", lambda tag: time.sleep(30))
+    paths = [tmp_path / "a.c", tmp_path / "b.c"]
+
+    start = time.perf_counter()
+    # fork: o trabalhador herda o translate trocado acima
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("fork")) as executor:
+        report = asyncio.run(run_pipeline(paths, lambda path: tmp_path / f"{path.name}.clearly", srcml_jobs=1,
+                                          translate_jobs=1, executor=executor, timeout=0.5))
+
+    assert list(report.failures) == paths
+    assert all(error.startswith("timeout") for error in report.failures.values())
+    assert time.perf_counter() - start < 10
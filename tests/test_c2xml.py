@@ -0,0 +1,33 @@
+import os
+from pathlib import Path
+
+from source.c2xml import ARCHIVE_FLAGS, c2xml_batch
+from source.srcml_cache import SrcmlCache
+from source.xml2clearly.translate import translate
+
+ARCHIVE_PATH = os.path.abspath(os.path.join('tests', 'xml_samples', 'translate', 'archive.xml'))
+
+
+def test_batch_yields_in_input_order_with_cache_hits(tmp_path, monkeypatch):
+    # srcML falso: responde sempre com o archive de funcs.c e vars.c
+    script = tmp_path / "srcml"
+    script.write_text(f"#!/bin/sh\necho \"$@\" > \"{tmp_path}/args\"\ncat \"{ARCHIVE_PATH}\"\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("CCLEARLY_SRCML", str(script))
+    monkeypatch.chdir(tmp_path)
+    for name in ("funcs.c", "hit.c", "vars.c"):
+        Path(name).write_text(f"/* {name} */\n")
+
+    cache = SrcmlCache(tmp_path / "xml", version="srcml 1.0.0")
+    cached = b'<unit xmlns="http://www.srcML.org/srcML/src" filename="hit.c"/>'
+    cache.put(b"/* hit.c */\n", cached, ARCHIVE_FLAGS)
+
+    units = list(c2xml_batch(["funcs.c", "hit.c", "vars.c"], cache=cache))
+
+    assert [name for name, _ in units] == ["funcs.c", "hit.c", "vars.c"]
+    assert (tmp_path / "args").read_text().split()[-2:] == ["funcs.c", "vars.c"]
+    # Unidades de archive ficam na chave do --archive, não na do arquivo avulso
+    assert cache.get(b"/* vars.c */\n") is None
+    stored = cache.get(b"/* vars.c */\n", ARCHIVE_FLAGS)
+    assert b'filename="vars.c"' in stored
+    assert translate(units[2][1]) == "a: int = 1"
@@ -0,0 +1,29 @@
+import pytest
+from lxml import etree
+
+from benchmarks.corpus import SHAPES, generate
+
+POS_START = "{http://www.srcML.org/srcML/position}start"
+
+
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_generated_corpus_is_well_formed_and_deterministic(shape):
+    source, xml = generate(shape, 40, seed=1)
+
+    assert generate(shape, 40, seed=1) == (source, xml)
+    root = etree.fromstring(xml)
+    # O texto do XML é o próprio código C
+    assert "".join(root.itertext()) == source
+
+    # pos:start aponta para o primeiro caractere não branco do elemento no código
+    # (<type ref="prev"/> é vazio e repete a posição do tipo original, como no srcML)
+    lines = source.split("\n")
+    for elem in root.iter():
+        start = elem.get(POS_START)
+        if start and "".join(elem.itertext()).strip():
+            line, col = map(int, start.split(":"))
+            assert lines[line - 1][col - 1] == "".join(elem.itertext()).lstrip()[0]
+
+
+def test_seed_changes_the_corpus():
+    assert generate("declarations", 40, seed=1) != generate("declarations", 40, seed=2)
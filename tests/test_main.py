@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from source import main
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'functions.xml')
+
+
+def fake_c_to_tag(path, cache=None):
+    # Trabalhadores herdam este substituto (fork): o nome do arquivo decide o que acontece
+    if path.stem == "crash":
+        os._exit(1)
+    if path.stem == "slow":
+        time.sleep(5)
+    if path.stem == "broken":
+        raise ValueError("XML corrompido")
+    return generate_tag(XML_PATH)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="o substituto só chega aos trabalhadores via fork")
+def test_translate_tree_isolates_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "c_to_tag", fake_c_to_tag)
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    for name in ("a.c", "sub/b.c", "sub/broken.c", "crash.c", "slow.c"):
+        (source / name).write_text("int x;\n")
+
+    results = main.translate_tree(source, tmp_path / "out", jobs=2, timeout=0.5, use_cache=False)
+    statuses = {path.relative_to(source).as_posix(): result[0] for path, result in results.items()}
+
+    assert statuses == {"a.c": "ok", "sub/b.c": "ok", "sub/broken.c": "error", "crash.c": "error", "slow.c": "timeout"}
+    expected = translate(generate_tag(XML_PATH))
+    assert (tmp_path / "out" / "sub" / "b.c.clearly").read_text() == expected
+    assert not (tmp_path / "out" / "crash.c.clearly").exists()
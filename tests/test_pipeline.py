@@ -0,0 +1,56 @@
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from source.pipeline import translate_c_source
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'functions.xml')
+
+
+@pytest.fixture
+def fake_srcml(tmp_path, monkeypatch):
+    # srcML falso: guarda o stdin e os argumentos, responde com o XML da amostra
+    script = tmp_path / "srcml"
+    script.write_text(
+        "#!/bin/sh\n"
+        f"cat > \"{tmp_path}/stdin\"\n"
+        f"echo \"$@\" > \"{tmp_path}/args\"\n"
+        "case \"$*\" in *broken*) echo 'erro' >&2; exit 3;; esac\n"
+        "case \"$*\" in *noisy*) head -c 1048576 /dev/zero >&2;; esac\n"
+        f"cat \"{os.path.abspath(XML_PATH)}\"\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("CCLEARLY_SRCML", str(script))
+    return tmp_path
+
+
+def test_translates_source_text_through_stdin(fake_srcml):
+    output = translate_c_source("int main(void) { return 0; }\n", filename="funcs.c")
+
+    assert output == translate(generate_tag(XML_PATH))
+    assert (fake_srcml / "stdin").read_text() == "int main(void) { return 0; }\n"
+    assert (fake_srcml / "args").read_text().split() == ["--position", "-l", "C", "--filename", "funcs.c"]
+
+
+def test_paths_are_passed_as_files(fake_srcml):
+    translate_c_source(Path("funcs.c"))
+
+    assert (fake_srcml / "stdin").read_text() == ""
+    assert (fake_srcml / "args").read_text().split() == ["--position", "-l", "C", "funcs.c"]
+
+
+def test_srcml_failure_raises(fake_srcml):
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        translate_c_source(Path("broken.c"))
+
+    assert error.value.returncode == 3
+    assert error.value.stderr == b"erro\n"
+
+
+def test_stderr_larger_than_a_pipe_does_not_block(fake_srcml):
+    # 1 MiB de diagnósticos antes do XML: lendo o stderr só no fim, travaria
+    assert translate_c_source(Path("noisy.c")) == translate(generate_tag(XML_PATH))
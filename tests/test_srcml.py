@@ -0,0 +1,31 @@
+import os
+from source import srcml
+
+
+def fake_appimage(path, version):
+    # Imita --appimage-extract: cria ./squashfs-root/AppRun e registra a extração
+    path.write_text(
+        "#!/bin/sh\n"
+        f"echo {version} >> \"{path}.log\"\n"
+        "mkdir -p squashfs-root && touch squashfs-root/AppRun\n"
+    )
+    path.chmod(0o755)
+
+
+def test_extracts_once_and_again_when_appimage_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(srcml, "_resolved", {})
+    appimage = tmp_path / "srcml.AppImage"
+    log = tmp_path / "srcml.AppImage.log"
+
+    fake_appimage(appimage, "v1")
+    first = srcml.extracted_srcml(appimage)
+    srcml._resolved.clear()  # força a leitura do carimbo, como um processo novo
+    assert srcml.extracted_srcml(appimage) == first
+    assert log.read_text().split() == ["v1"]
+
+    fake_appimage(appimage, "v2")
+    os.utime(appimage, ns=(0, 0))
+    second = srcml.extracted_srcml(appimage)
+    assert second != first and second.exists()
+    assert log.read_text().split() == ["v1", "v2"]
@@ -0,0 +1,41 @@
+import os
+
+from source.srcml_cache import SrcmlCache
+
+
+def make_cache(tmp_path, **kwargs):
+    return SrcmlCache(tmp_path / "xml", version="srcml 1.0.0", **kwargs)
+
+
+def test_hits_and_misses(tmp_path):
+    cache = make_cache(tmp_path)
+
+    assert cache.get(b"int a;") is None
+    cache.put(b"int a;", b"<unit/>")
+    assert cache.get(b"int a;") == b"<unit/>"
+    assert cache.fetch(b"int b;", lambda source: b"<unit>" + source + b"</unit>") == b"<unit>int b;</unit>"
+
+    assert dict(cache.stats) == {"misses": 2, "hits": 1, "stores": 2}
+
+
+def test_key_depends_on_version_and_flags(tmp_path):
+    cache = make_cache(tmp_path)
+
+    assert cache.key(b"x") != SrcmlCache(tmp_path, version="srcml 1.0.1").key(b"x")
+    assert cache.key(b"x") != SrcmlCache(tmp_path, version="srcml 1.0.0", flags=["-l", "C"]).key(b"x")
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path)
+    for index, source in enumerate((b"old", b"used", b"new")):
+        cache.put(source, os.urandom(1000))
+        path = cache._path(cache.key(source))
+        os.utime(path, ns=(index, index))
+
+    cache.get(b"old")  # vira a mais recente
+    cache.max_bytes = 2 * 1100
+    cache.evict()
+
+    assert cache.get(b"used") is None
+    assert cache.get(b"old") is not None and cache.get(b"new") is not None
+    assert cache.stats["evictions"] == 1
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+import pytest
+
+from source.watch import InotifyWatcher, make_watcher, watch
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'functions.xml')
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+@pytest.mark.parametrize("polling", [True, False])
+def test_watch_retranslates_saved_files(tmp_path, monkeypatch, polling):
+    if not polling:
+        probe = make_watcher(tmp_path)
+        probe.close()
+        if not isinstance(probe, InotifyWatcher):
+            pytest.skip("inotify indisponível")
+
+    script = tmp_path / "srcml"
+    script.write_text(f"#!/bin/sh\ncat \"{os.path.abspath(XML_PATH)}\"\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("CCLEARLY_SRCML", str(script))
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    (source / "sub" / "a.c").write_text("int a;\n")
+
+    events = []
+    stop = threading.Event()
+    thread = threading.Thread(target=watch, args=(source, tmp_path / "out"), daemon=True,
+                              kwargs={"debounce": 0.05, "polling": polling, "should_stop": stop.is_set,
+                                      "report": lambda path, status, seconds: events.append((path.name, status))})
+    thread.start()
+    try:
+        output = tmp_path / "out" / "sub" / "a.c.clearly"
+        wait_for(output.exists)
+
+        time.sleep(0.05)  # mtime diferente para o PollingWatcher
+        (source / "sub" / "a.c").write_text("int a = 1;\n")
+        (source / "sub" / "b.c").write_text("int b;\n")
+        wait_for(lambda: ("b.c", "ok") in events)
+        (source / "sub" / "a.c").unlink()
+        wait_for(lambda: ("a.c", "removed") in events)
+    finally:
+        stop.set()
+        thread.join(5)
+
+    assert events.count(("a.c", "ok")) == 2
+    assert (tmp_path / "out" / "sub" / "b.c.clearly").read_text() == translate(generate_tag(XML_PATH))
+    assert not output.exists()
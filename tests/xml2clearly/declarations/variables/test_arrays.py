@@ -0,0 +1,31 @@
+from lxml import etree
+from benchmarks.corpus import generate
+from source.xml2clearly.declarations.variables import arrays
+from source.xml2clearly.translate import new_context, translate
+from source.xml2clearly.xml_manager import Tag
+
+SRC = "http://www.srcML.org/srcML/src"
+POS = "http://www.srcML.org/srcML/position"
+
+
+def test_flat_literal_blocks_skip_per_element_dispatch(monkeypatch):
+    root = Tag(etree.fromstring(generate("blobs", 40)[1]))
+    block = next(node for node in root.walk() if node.name == "block")
+    assert arrays.flat_literals(block) == [expr.children[0].text for expr in block.children]
+
+    fast = translate(root, new_context())
+    monkeypatch.setattr(arrays, "flat_literals", lambda tag: None)
+    assert translate(root, new_context()) == fast
+    assert fast.startswith("blob: array(_, const uint8_t) = (\n    0x")
+
+
+def test_single_line_and_non_flat_blocks():
+    xml = (f'<decl xmlns="{SRC}" xmlns:pos="{POS}"><type><name>int</name></type> '
+           '<name><name>v</name><index>[]</index></name> <init>= <expr><block pos:start="1:10" pos:end="1:20">{'
+           '<expr><literal>1</literal></expr>, <expr><operator>-</operator><literal>2</literal></expr>'
+           '}</block></expr></init></decl>')
+    decl = Tag(etree.fromstring(xml))
+    block = decl.find("init").find("expr").find("block")
+
+    assert arrays.flat_literals(block) is None
+    assert translate(decl, new_context()) == "v: array(_, int) = [1, - 2]"
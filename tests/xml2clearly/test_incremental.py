@@ -0,0 +1,45 @@
+import io
+import os
+from lxml import etree
+from source.xml2clearly.incremental import IncrementalCache, translate_incremental
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import POS_END, POS_START, generate_tag
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'functions.xml')
+
+
+def shifted_xml(lines):
+    """Mesmo XML com todas as linhas deslocadas, como se houvesse código novo acima."""
+    tree = etree.parse(XML_PATH)
+    for elem in tree.iter():
+        for key in (POS_START, POS_END):
+            pos = elem.get(key)
+            if pos:
+                line, col = pos.split(":")
+                elem.set(key, f"{int(line) + lines}:{col}")
+    return etree.tostring(tree)
+
+
+def test_unchanged_children_are_reused(tmp_path):
+    cache = IncrementalCache(tmp_path / "functions.json")
+    expected = translate(generate_tag(XML_PATH))
+
+    assert translate_incremental(XML_PATH, cache) == expected
+    assert cache.stats["hits"] == 0
+    cache.save()
+
+    cache = IncrementalCache(tmp_path / "functions.json")
+    assert translate_incremental(XML_PATH, cache) == expected
+    assert cache.stats["misses"] == 0
+
+
+def test_cache_survives_moving_code_down(tmp_path):
+    cache = IncrementalCache(tmp_path / "functions.json")
+    translate_incremental(XML_PATH, cache)
+    cache.stats.clear()
+
+    shifted = shifted_xml(3)
+    output = translate_incremental(io.BytesIO(shifted), cache)
+
+    assert output == translate(generate_tag(io.BytesIO(shifted)))
+    assert cache.stats["misses"] == 0
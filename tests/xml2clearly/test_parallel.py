@@ -0,0 +1,21 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from source.xml2clearly.parallel import split_chunks, translate_parallel
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'functions.xml')
+
+
+def test_split_chunks_keeps_order_and_balances():
+    chunks = split_chunks("abcdef", [5, 1, 1, 1, 1, 1], 2)
+
+    assert chunks == [["a"], ["b", "c", "d", "e", "f"]]
+
+
+def test_parallel_translation_matches_serial():
+    expected = translate(generate_tag(XML_PATH))
+
+    with ThreadPoolExecutor(3) as executor:
+        assert translate_parallel(XML_PATH, workers=3, executor=executor, min_nodes=0) == expected
+    assert translate_parallel(XML_PATH, workers=2, min_nodes=0) == expected
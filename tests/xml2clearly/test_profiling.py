@@ -0,0 +1,29 @@
+import os
+
+from source.xml2clearly import profiling
+from source.xml2clearly.registry import DISPATCH
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import generate_tag
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'functions.xml')
+
+
+def test_profiling_counts_without_changing_output():
+    tag = generate_tag(XML_PATH)
+    expected = translate(tag)
+    original = dict(DISPATCH)
+
+    profiling.reset()
+    profiling.enable()
+    try:
+        assert translate(tag) == expected
+    finally:
+        profiling.disable()
+
+    assert DISPATCH == original
+    stats = {(tag_name, func.__name__): entry for (tag_name, func), entry in profiling.STATS.items()}
+    function = stats["function", "translate_function_def"]
+    assert function.calls == len(tag.find_children("function"))
+    assert function.inclusive >= function.exclusive > 0
+    assert profiling.FALLBACKS["unit"] == 1
+    assert "translate_function_def" in profiling.format_report()
@@ -0,0 +1,74 @@
+import random
+from lxml import etree
+from source.xml2clearly.query import query
+from source.xml2clearly.xml_manager import LazyTag, Tag
+
+SRC = "http://www.srcML.org/srcML/src"
+XML = (f'<block xmlns="{SRC}"><expr><index>[<expr><literal>0</literal></expr>]</index></expr>'
+       '<expr><literal>1</literal></expr><expr><name>a</name><index>[<expr><name>i</name></expr>]</index></expr></block>')
+
+
+def texts(nodes):
+    return [node.name + ":" + "".join(n.text or "" for n in node.walk()) for node in nodes]
+
+
+def random_tree(rng, size):
+    root = etree.Element(f"{{{SRC}}}unit")
+    nodes = [root]
+    for i in range(size):
+        child = etree.SubElement(rng.choice(nodes), f"{{{SRC}}}{rng.choice('abc')}")
+        child.text = str(i)
+        nodes.append(child)
+    return root
+
+
+def test_random_paths_match_on_tag_and_lazy_tag():
+    rng = random.Random(0)
+    for _ in range(300):
+        root = random_tree(rng, rng.randrange(1, 40))
+        path = "".join(rng.choice(("/", "//")) + rng.choice("abc*") for _ in range(rng.randrange(1, 4)))
+        path = path[1:] if path.startswith("/") and not path.startswith("//") else path
+        tag, lazy = Tag(root), LazyTag(root)
+
+        expected = [node.text for node in query(path).all(lazy)]
+        assert [node.text for node in query(path).all(tag)] == expected, path
+        assert len(set(expected)) == len(expected)
+
+
+def test_paths_in_document_order():
+    tag = Tag(etree.fromstring(XML))
+
+    assert texts(query("//index").all(tag)) == ["index:[0", "index:[i"]
+    assert texts(query("expr/literal").all(tag)) == ["literal:1"]
+    assert query("//literal").first(tag).text == "0"
+    assert not query("//call").exists(LazyTag(etree.fromstring(XML)))
+    assert tag.search("expr/literal")[0].text == "1"
+
+    nested = Tag(etree.fromstring(f'<r xmlns="{SRC}"><a><b>1<a><b>2</b></a></b><b>3</b></a></r>'))
+    assert [node.text for node in query("//a/b").all(nested)] == ["1", "2", "3"]
+
+
+def test_lazy_results_are_the_tree_nodes():
+    lazy = LazyTag(etree.fromstring(XML))
+    index = query("//index").first(lazy)
+
+    assert index is lazy.children[0].children[0]
+    assert index.parent is lazy.children[0]
+    assert query("index").first(lazy.children[0]) is index
+
+
+def test_queries_are_compiled_once():
+    assert query("expr//index") is query("expr//index")
+
+
+def test_wide_lazy_node_maps_results_back_once():
+    root = etree.Element(f"{{{SRC}}}block")
+    for i in range(20000):
+        etree.SubElement(etree.SubElement(root, f"{{{SRC}}}expr"), f"{{{SRC}}}literal").text = str(i)
+    lazy = LazyTag(root)
+
+    # Mapeando cada resultado com uma busca linear entre os irmãos, seriam 200 milhões de comparações
+    literals = query("//literal").all(lazy)
+
+    assert [node.text for node in literals[:3]] == ["0", "1", "2"]
+    assert literals[-1].parent is lazy.children[-1]
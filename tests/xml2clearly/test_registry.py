@@ -0,0 +1,49 @@
+import pytest
+from lxml import etree
+from source.xml2clearly import profiling
+from source.xml2clearly.registry import AVOIDED_CALLS, CONTINUATIONS, DISPATCH, PREDICATES, TRANSLATORS, register
+from source.xml2clearly.translate import translate
+from source.xml2clearly.xml_manager import Tag
+
+
+@pytest.fixture
+def scratch_tag():
+    # Tag só deste teste; os registros saem do registro global no fim
+    yield "test_applies"
+    for _, func in TRANSLATORS.pop("test_applies", []):
+        PREDICATES.pop(func, None)
+        CONTINUATIONS.discard(func)
+    DISPATCH.pop("test_applies", None)
+
+
+def test_applies_predicate_skips_translator(scratch_tag):
+    calls = []
+
+    @register(scratch_tag, priority=10, applies=lambda tag: tag.text == "yes")
+    def picky(tag, ctx):
+        calls.append(tag.text)
+        return "picky"
+
+    @register(scratch_tag, priority=0)
+    def generic(tag, ctx):
+        return "generic"
+
+    # Registro depois do freeze() recompila a entrada da tag
+    assert [entry[0] for entry in DISPATCH[scratch_tag]] == [picky, generic]
+
+    yes = etree.Element(scratch_tag)
+    yes.text = "yes"
+
+    assert translate(Tag(yes)) == "picky"
+    assert translate(Tag(etree.Element(scratch_tag))) == "generic"
+    assert calls == ["yes"]
+    # Sem instrumentação, nada é contado no caminho quente
+    assert AVOIDED_CALLS[scratch_tag] == 0
+
+    profiling.reset()
+    profiling.enable()
+    try:
+        assert translate(Tag(etree.Element(scratch_tag))) == "generic"
+    finally:
+        profiling.disable()
+    assert AVOIDED_CALLS[scratch_tag] == 1
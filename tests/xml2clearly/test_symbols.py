@@ -0,0 +1,45 @@
+import io
+import os
+from lxml import etree
+from benchmarks.corpus import generate
+from source.xml2clearly.incremental import IncrementalCache, translate_incremental
+from source.xml2clearly.translate import new_context, translate, translate_stream
+from source.xml2clearly.xml_manager import generate_tag
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'symbols.xml')
+
+
+def test_call_types_from_symbol_table():
+    text = translate(generate_tag(XML_PATH))
+
+    for call in ("call ptr cb(v)", "call ptr other(v)", "call ptr local(v)", "call macro SQUARE(v)",
+                 "call fn add(v, v)", "call ptr h(v)", "call ptr global_fp(v)"):
+        assert call in text
+    assert "x: int = 1, y: int, z: int" in text
+
+    out = io.StringIO()
+    translate_stream(XML_PATH, out)
+    assert out.getvalue() == text
+
+
+def test_incremental_cache_sees_new_macros():
+    # Sem o #define SQUARE a chamada é de função; com ele, o mesmo filho em cache não vale mais
+    tree = etree.parse(XML_PATH)
+    root = tree.getroot()
+    root.remove(root[0])
+    cache = IncrementalCache()
+
+    assert "call fn SQUARE(v)" in translate_incremental(io.BytesIO(etree.tostring(tree)), cache)
+    assert "call macro SQUARE(v)" in translate_incremental(XML_PATH, cache)
+    assert translate_incremental(XML_PATH, cache) == translate(generate_tag(XML_PATH))
+
+
+def test_streaming_keeps_only_the_current_child_ancestors():
+    sizes = []
+    for count in (20, 200):
+        ctx = new_context()
+        translate_stream(io.BytesIO(generate("functions", count)[1]), io.StringIO(), ctx)
+        sizes.append(len(ctx.cache("ancestors")))
+
+    # Só o último filho de topo fica no cache, qualquer que seja o tamanho do arquivo
+    assert sizes[0] == sizes[1] < 50
@@ -0,0 +1,125 @@
+import io
+import os
+import sys
+from lxml import etree
+from source.xml2clearly.emitter import Emitter
+from source.xml2clearly.translate import MAX_SPACES, emit, iter_spacing, translate, translate_stream
+from source.xml2clearly.xml_manager import Tag, generate_tag, iter_archive_units, iter_unit_children
+
+XML_PATH = os.path.join('tests', 'xml_samples', 'translate', 'functions.xml')
+ARCHIVE_PATH = os.path.join('tests', 'xml_samples', 'translate', 'archive.xml')
+SRC = "{http://www.srcML.org/srcML/src}"
+
+
+def test_stream_matches_full_translation():
+    out = io.StringIO()
+    translate_stream(XML_PATH, out)
+
+    assert out.getvalue() == translate(generate_tag(XML_PATH))
+
+
+def test_lazy_tags_translate_like_eager_tags():
+    assert translate(generate_tag(XML_PATH, lazy=True)) == translate(generate_tag(XML_PATH))
+
+
+def test_translate_deep_trees_without_recursion():
+    depth = 4 * sys.getrecursionlimit()
+    root = expr = etree.Element(SRC + "expr")
+    for _ in range(depth):
+        call = etree.SubElement(expr, SRC + "call")
+        etree.SubElement(call, SRC + "name").text = "f"
+        argument = etree.SubElement(etree.SubElement(call, SRC + "argument_list"), SRC + "argument")
+        expr = etree.SubElement(argument, SRC + "expr")
+    etree.SubElement(expr, SRC + "literal").text = "1"
+
+    output = translate(Tag(root))
+
+    assert output == "call fn f(" * depth + "1" + ")" * depth
+
+
+def test_iter_unit_children_yields_top_level_tags():
+    names = [tag.name for tag in iter_unit_children(XML_PATH)]
+    full = generate_tag(XML_PATH)
+
+    assert names == [child.name for child in full.children]
+    assert all(tag.parent.name == "unit" for tag in iter_unit_children(XML_PATH))
+    # O unit só ganha filhos pela tabela de símbolos, um a um (ver symbols.declare)
+    assert all(tag.parent.children == [] for tag in iter_unit_children(XML_PATH))
+
+
+def test_archive_units_translate_like_single_files():
+    units = dict(iter_archive_units(ARCHIVE_PATH))
+
+    assert list(units) == ["funcs.c", "vars.c"]
+    assert translate(units["funcs.c"]) == translate(generate_tag(XML_PATH))
+    assert [name for name, _ in iter_archive_units(XML_PATH)] == ["funcs.c"]
+
+
+# archive.xml: srcml --archive --position -l C funcs.c vars.c (vars.c is "int a = 1;")
+# C code used as input (tests/xml_samples/translate/functions.xml):
+"""
+#include <stdio.h>
+#include "local.h"
+#define FLAG
+#define VAL 3
+
+/* block comment */
+static int counter = 0;
+char **argv_copy;
+int *p, q, **r = 0;
+
+typedef struct point { int x; int y; } point_t;
+
+int add(int a, int b);
+static char *dup(const char *s, int n);
+
+int add(int a, int b)
+{
+    int c = a + b;
+    return c;
+}
+
+void run(void)
+{
+    int values[4] = {1, 2, 3, 4};
+    int grid[2][2] = {{1, 2}, {3, 4}};
+    printf("%d\n", add(1, 2));
+    foo(bar(1), baz(2, 3), 4 * 5 + 6);
+    return;
+}
+
+unsigned long big[3] = {0x12, 0x34,
+    0x56};
+int sparse[5] = {[1] = 5, [3] = 7, 9};
+const char *names[] = {"a", "b"};
+double x = 1.0 + 2.0 * (3.0 - 4.0), y, z = x;
+"""
+
+
+def test_huge_column_gaps_are_capped():
+    # Código minificado/gerado: irmãos na mesma linha a milhares de colunas de distância
+    pos = "{http://www.srcML.org/srcML/position}"
+    root = etree.Element(SRC + "expr")
+    etree.SubElement(root, SRC + "name", {pos + "start": "1:1", pos + "end": "1:1"}).text = "a"
+    etree.SubElement(root, SRC + "name", {pos + "start": "1:100000", pos + "end": "1:100000"}).text = "b"
+    etree.SubElement(root, SRC + "name", {pos + "start": "3:1", pos + "end": "3:1"}).text = "c"
+
+    spacings = [spacing for _, spacing in iter_spacing(Tag(root).children)]
+
+    assert spacings == ["", " " * MAX_SPACES, "\n\n"]
+
+
+def test_emit_streams_the_same_text():
+    tag = generate_tag(XML_PATH)
+    writes = []
+
+    class Output:
+        def write(self, text):
+            writes.append(text)
+
+    out = Emitter(Output(), buffer_size=16)
+    emit(tag, out)
+    out.flush()
+
+    assert "".join(writes) == translate(tag)
+    assert len(writes) > 1
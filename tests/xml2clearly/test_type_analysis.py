@@ -0,0 +1,60 @@
+from lxml import etree
+from source.xml2clearly.type_analysis import CType, analyze_key, analyze_type
+from source.xml2clearly.xml_manager import Tag
+
+SRC = "http://www.srcML.org/srcML/src"
+
+
+def type_tag(xml):
+    return Tag(etree.fromstring(f'<type xmlns="{SRC}">{xml}</type>'))
+
+
+def test_analysis_fields_and_renderings():
+    xml = ("<specifier>static</specifier> <specifier>const</specifier> <name>unsigned</name> <name>long</name> "
+           "<modifier>*</modifier><modifier>*</modifier>")
+    info = analyze_type(type_tag(xml))
+
+    assert isinstance(info, CType)
+    assert info.base == "unsigned long"
+    assert info.qualifiers == ("const",)
+    assert info.storage == ("static",)
+    assert info.array_dims == ()
+    assert info.pointer_depth == 2
+    assert info.first_word == "static"
+    assert info.words == ("static", "const", "unsigned", "long", "*", "*")
+    assert info.text == "const unsigned long * *"
+
+
+def test_pointer_base_skips_storage():
+    info = analyze_type(type_tag("<specifier>extern</specifier> <name>char</name> <modifier>*</modifier>"))
+
+    assert info.pointer_base == "char"
+    assert info.first_word == "extern"
+    assert info.pointer_depth == 1
+
+
+def test_pointer_base_follows_code_order():
+    # Qualificador antes da base conta (ptr(const)); depois dela, não
+    const_first = analyze_type(type_tag("<specifier>const</specifier> <name>char</name> <modifier>*</modifier>"))
+    const_after = analyze_type(type_tag("<name>char</name> <specifier>const</specifier> <modifier>*</modifier>"))
+
+    assert const_first.pointer_base == "const"
+    assert const_after.pointer_base == "char"
+    assert const_first.base == const_after.base == "char"
+    assert const_first.qualifiers == const_after.qualifiers == ("const",)
+
+
+def test_array_dims_inside_the_type():
+    info = analyze_type(type_tag("<name>int</name><index>[<expr><literal>3</literal></expr>]</index>"
+                                 "<index>[]</index>"))
+
+    assert info.array_dims == ("3", "")
+
+
+def test_same_structure_is_analyzed_once():
+    analyze_key.cache_clear()
+    first = analyze_type(type_tag("<name>int</name> <modifier>*</modifier>"))
+    second = analyze_type(type_tag("<name>int</name> <modifier>*</modifier>"))
+
+    assert first is second
+    assert analyze_key.cache_info().misses == 1
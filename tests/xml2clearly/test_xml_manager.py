@@ -0,0 +1,114 @@
+import sys
+from lxml import etree
+from source.xml2clearly.xml_manager import LazyTag, Tag
+
+SRC = "{http://www.srcML.org/srcML/src}"
+POS = "{http://www.srcML.org/srcML/position}"
+
+
+def test_tag_keeps_only_translator_attributes():
+    elem = etree.Element(SRC + "literal", {"type": "number", POS + "start": "3:7", POS + "end": "3:9", "extra": "x"})
+    elem.text = " 42 "
+    tag = Tag(elem)
+
+    assert tag.name == "literal"
+    assert tag.text == "42"
+    assert tag.start == (3, 7) and tag.end == (3, 9)
+    assert dict(tag.attrib) == {"type": "number", POS + "start": "3:7", POS + "end": "3:9"}
+
+
+def test_tag_without_positions_sorts_last():
+    root = etree.Element(SRC + "expr")
+    etree.SubElement(root, SRC + "name")
+    etree.SubElement(root, SRC + "literal", {POS + "start": "1:5", POS + "end": "1:6"})
+    tag = Tag(root)
+
+    assert [c.name for c in tag.children] == ["literal", "name"]
+    assert tag.children[1].start == (float("inf"), float("inf"))
+    assert tag.children[1].end == (float("-inf"), float("-inf"))
+
+
+def test_tag_builds_deep_trees_iteratively():
+    depth = sys.getrecursionlimit() * 5
+    root = elem = etree.Element(SRC + "block")
+    for _ in range(depth):
+        elem = etree.SubElement(elem, SRC + "block")
+
+    tag = Tag(root)
+    node = tag
+    while node.children:
+        node = node.children[0]
+
+    assert node.indent_level == depth
+
+
+def test_lazy_tag_matches_tag():
+    root = etree.Element(SRC + "block", {POS + "start": "1:1", POS + "end": "2:1"})
+    expr = etree.SubElement(root, SRC + "expr", {POS + "start": "1:9", POS + "end": "1:9"})
+    etree.SubElement(expr, SRC + "literal", {"type": "number", POS + "start": "1:9", POS + "end": "1:9"}).text = "2"
+    etree.SubElement(root, SRC + "expr", {POS + "start": "1:3", POS + "end": "1:3"}).text = "1"
+
+    lazy, eager = LazyTag(root), Tag(root)
+
+    assert [t.name for t in lazy.walk()] == [t.name for t in eager.walk()]
+    assert [t.start for t in lazy.walk()] == [t.start for t in eager.walk()]
+    assert [t.indent_level for t in lazy.walk()] == [t.indent_level for t in eager.walk()]
+    assert lazy.find("expr").text == "1"
+    assert lazy.search("expr/literal")[0].attrib.get("type") == "number"
+    assert lazy.children is lazy.children
+
+
+def test_wide_nodes_find_children_by_name():
+    root = etree.Element(SRC + "block_content")
+    for i in range(50):
+        etree.SubElement(root, SRC + ("decl_stmt" if i % 5 else "expr_stmt")).text = str(i)
+    etree.SubElement(root, SRC + "return").text = "r"
+
+    for tag in (Tag(root), LazyTag(root)):
+        assert tag.find("return").text == "r"
+        assert tag.find("while") is None
+        assert [c.text for c in tag.find_children("expr_stmt")] == [str(i) for i in range(0, 50, 5)]
+        assert tag.find_children("expr_stmt") is not tag.find_children("expr_stmt")
+
+
+def test_walk_prune_and_find_first():
+    root = etree.Element(SRC + "unit")
+    function = etree.SubElement(root, SRC + "function")
+    etree.SubElement(etree.SubElement(function, SRC + "block"), SRC + "name").text = "inner"
+    etree.SubElement(root, SRC + "name").text = "outer"
+    tag = Tag(root)
+
+    pruned = [t.name for t in tag.walk(prune=lambda t: t.name == "function")]
+    assert pruned == ["unit", "function", "name"]
+    assert tag.find_first("name").text == "inner"
+    assert tag.find_first("name", prune=lambda t: t.name == "function").text == "outer"
+    assert tag.find_first("unit") is tag
+
+
+def test_subtree_kinds_summary():
+    root = etree.Element(SRC + "block")
+    expr = etree.SubElement(root, SRC + "expr")
+    etree.SubElement(etree.SubElement(expr, SRC + "name"), SRC + "index")
+    etree.SubElement(root, SRC + "expr").text = "1"
+
+    for tag in (Tag(root), LazyTag(root)):
+        assert tag.has_kind("block") and tag.has_kind("index")
+        assert tag.children[0].has_kind("index")
+        assert not tag.children[1].has_kind("index")
+        assert not tag.has_kind("call")
+
+
+def test_lazy_kinds_reuse_children_summaries():
+    depth = 5000  # quadrático (cada nível percorrendo a subárvore de novo) leva minutos
+    root = expr = etree.Element(SRC + "expr")
+    for _ in range(depth):
+        expr = etree.SubElement(etree.SubElement(expr, SRC + "block"), SRC + "expr")
+    etree.SubElement(expr, SRC + "literal").text = "1"
+
+    lazy = LazyTag(root)
+    node, levels = lazy, 0
+    while node.children:
+        assert node.has_kind("literal")
+        node, levels = node.children[0], levels + 1
+
+    assert levels == 2 * depth + 1